@@ -394,3 +394,17 @@ def delete_path_trace(path_id, ticket):
     path_status_code = path_response.status_code
     return path_status_code
 
+
+def run_path_traces(flow_list, ticket, delete=True, max_active=10, timeout=120):
+    """
+    This function will run a path trace for each flow in the {flow_list}, see utils.run_path_traces
+    :param flow_list: list of (source IP address, destination IP address)
+    :param ticket: APIC-EM ticket
+    :param delete: if True, all the created path traces are deleted at the end
+    :param max_active: max number of path traces in progress
+    :param timeout: max wait time, in seconds, for each path trace
+    :return: iterator of (src_ip, dest_ip, path_id, path_status, path_list), as soon as each path trace is done
+    """
+    return utils.run_path_traces(flow_list, create_path_trace, get_path_trace_info, ticket,
+                                 delete_path_trace if delete else None, max_active, timeout)
+
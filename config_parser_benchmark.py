@@ -0,0 +1,103 @@
+# developed by Gabi Zapodeanu, TME, Enterprise Networks, Cisco Systems
+
+
+# !/usr/bin/env python3
+
+
+import contextlib
+import os
+import random
+import re
+import time
+
+import utils  # import the utils module
+
+
+CONFIG_COUNT = 10000
+INTERFACE_COUNT = 40
+
+
+def create_config(index):
+    """
+    This function will create a synthetic router configuration, with {INTERFACE_COUNT} interfaces, VRFs,
+    secondary addresses, and routing protocol sections
+    :param index: configuration index, used for hostname and addresses
+    :return: configuration text
+    """
+    config_lines = ['!', 'hostname BR' + str(index), '!', 'ip vrf SECURE_REMOTE', ' rd 201:1', '!']
+    for interface in range(INTERFACE_COUNT):
+        config_lines.append('interface GigabitEthernet0/' + str(interface))
+        config_lines.append(' description link ' + str(interface))
+        if interface % 4 == 0:
+            config_lines.append(' ip vrf forwarding SECURE_REMOTE')
+        config_lines.append(' ip address 10.' + str(index % 250) + '.' + str(interface) + '.1 255.255.255.0')
+        if interface % 8 == 0:
+            config_lines.append(' ip address 10.' + str(index % 250) + '.' + str(interface + 100) +
+                                '.1 255.255.255.0 secondary')
+        config_lines.append(' ip helper-address 172.16.1.' + str(random.randint(1, 254)))
+        config_lines.append(' negotiation auto')
+        config_lines.append('!')
+    config_lines.append('router eigrp 123')
+    config_lines.append(' network 10.0.0.0 0.255.255.255')
+    config_lines.append('!')
+    config_lines.append('end')
+    return '\n'.join(config_lines)
+
+
+def legacy_identify_ipv4_address(configuration):
+    """
+    The line by line, word by word, address scan used by utils.identify_ipv4_address before the compiled parser
+    :param configuration: string with the configuration
+    :return: list of IPv4 addresses
+    """
+    ipv4_list = []
+    pattern = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
+    split_lines = configuration.split('\n')
+    for line in split_lines:
+        print(line)
+        if 'ip address' in line:
+            split_config = line.split(' ')
+            try:
+                split_config.remove('')
+            except ValueError:
+                pass
+            line_begins = split_config[0:3]
+            for word in line_begins:
+                check_ip = pattern.match(word)
+                if check_ip:
+                    if utils.validate_ipv4_(word):
+                        ipv4_list.append(word)
+    return ipv4_list
+
+
+def main():
+    """
+    The script will create a synthetic corpus of {CONFIG_COUNT} configurations, and will compare the time needed
+    to find the interface addresses with the legacy line by line scan and with utils.parse_ipv4_config
+    """
+
+    random.seed(0)
+    config_list = [create_config(index) for index in range(CONFIG_COUNT)]
+    corpus_size = sum(len(config) for config in config_list)
+    line_count = sum(config.count('\n') + 1 for config in config_list)
+    print('\nCorpus: ', CONFIG_COUNT, ' configurations, ', line_count, ' lines, ',
+          round(corpus_size / 1e6, 1), ' MB')
+
+    start_time = time.perf_counter()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        legacy_count = sum(len(legacy_identify_ipv4_address(config)) for config in config_list)
+    legacy_time = time.perf_counter() - start_time
+    print('\nLegacy scan:          ', legacy_count, ' addresses in ', round(legacy_time, 2), ' seconds')
+
+    start_time = time.perf_counter()
+    record_count = sum(len(utils.parse_ipv4_config(config)) for config in config_list)
+    parser_time = time.perf_counter() - start_time
+    print('utils.parse_ipv4_config: ', record_count, ' records in ', round(parser_time, 2), ' seconds, ',
+          round(line_count / parser_time / 1e6, 1), ' M lines/sec')
+
+    print('\nSpeedup: ', round(legacy_time / parser_time, 1), 'x')
+    print('\n\nEnd of Application Run\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -6,24 +6,225 @@
 
 import requests
 import json
+import asyncio
 import time
 import os
 import os.path
 import urllib3
 import socket
 import re
+import threading
+import collections
 import utils
+import records
 
 from urllib3.exceptions import InsecureRequestWarning  # for insecure https warnings
 from requests.auth import HTTPBasicAuth  # for Basic Auth
+from requests.adapters import HTTPAdapter  # for the connection pool size
+from concurrent.futures import ThreadPoolExecutor  # for the concurrent API calls
+
+from array import array  # for the health columns, if NumPy is not installed
 
 from config import DNAC_URL, DNAC_PASS, DNAC_USER
 
+try:
+    import numpy  # optional, for the vectorised health columns
+except ImportError:
+    numpy = None
+
 
 urllib3.disable_warnings(InsecureRequestWarning)  # disable insecure https warnings
 
 DNAC_AUTH = HTTPBasicAuth(DNAC_USER, DNAC_PASS)
 
+DNAC_POOL_SIZE = 10  # max number of keep-alive connections to DNA C
+DNAC_TOKEN_LIFETIME = 3600  # seconds, DNA C JWT token lifetime
+DNAC_TOKEN_REFRESH_MARGIN = 300  # seconds, a new token is requested this long before the current token expires
+DNAC_INVENTORY_TTL = 300  # seconds, device inventory cache lifetime
+DNAC_PAGE_SIZE = 500  # max number of devices returned by DNA C for one inventory call
+DNAC_CONFIG_INDEX_TTL = 900  # seconds, devices configurations address index lifetime
+DNAC_TEMPLATE_TTL = 300  # seconds, CLI templates catalog cache lifetime, for each project
+DNAC_TOPOLOGY_TTL = 300  # seconds, physical topology cache lifetime
+DNAC_TOPOLOGY_ROOT_ROLES = ('CORE', 'BORDER ROUTER')  # device roles used as roots for the blast radius
+DNAC_PATH_TRACE_TTL = 600  # seconds, path trace results cache lifetime
+DNAC_PATH_TRACE_CACHE_SIZE = 1000  # max number of path trace results in the cache
+DNAC_HEALTH_FIELDS = ('overallHealth', 'cpuScore', 'memoryScore', 'cpu', 'memory')  # numeric device-detail fields
+DNAC_TASK_TIMEOUT = 300  # seconds, max wait time for DNA C tasks to complete
+DNAC_FILE_TIMEOUT = 10  # seconds, max wait time for a DNA C file to be ready
+DNAC_FILE_CHUNK_SIZE = 65536  # bytes, chunk size for the DNA C files streaming download
+DNAC_CLI_MAX_COMMANDS = 5  # max number of CLI commands in one command runner read-request
+DNAC_CLI_MAX_DEVICES = 100  # max number of devices in one command runner read-request
+DNAC_DEPLOY_MAX_TARGETS = 100  # max number of devices in one template deployment
+
+
+class DnacClient:
+    """
+    DNA C client that owns one pooled, keep-alive requests session.
+    All the DNA C calls in this module are sent using the module client {DNAC_CLIENT}, the TCP and TLS handshakes are
+    done once for each pooled connection, and not for each API call.
+    To change the pool size replace the module client:
+    dnac_apis.DNAC_CLIENT = dnac_apis.DnacClient(pool_size=50, token_manager=dnac_apis.DNAC_TOKEN)
+    With a {token_manager}, a request with the token {None} is sent with the managed token, and a request rejected
+    with 401 is sent one more time with a new token
+    """
+
+    def __init__(self, pool_size=DNAC_POOL_SIZE, max_retries=0, token_manager=None):
+        """
+        :param pool_size: max number of keep-alive connections kept open to DNA C
+        :param max_retries: number of connection retries, for failed DNS lookups, socket connections or timeouts
+        :param token_manager: DnacTokenManager, or {None}
+        """
+        self.pool_size = pool_size
+        self.token_manager = token_manager
+        self.session = requests.Session()
+        self.session.verify = False
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=max_retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        """
+        This function will send the request using the pooled session
+        :param method: HTTP method
+        :param url: full URL
+        :param kwargs: any other requests arguments - headers, data, params, stream ...
+        :return: the response
+        """
+        header = kwargs.get('headers')
+        if self.token_manager is None or not header or 'x-auth-token' not in header:
+            return self.session.request(method, url, **kwargs)
+        if header['x-auth-token'] is None:
+            kwargs['headers'] = dict(header, **{'x-auth-token': self.token_manager.get_token()})
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code == 401:  # token expired or revoked, retry once with a new token
+            response.close()
+            dnac_jwt_token = self.token_manager.refresh(stale_token=kwargs['headers']['x-auth-token'])
+            kwargs['headers'] = dict(kwargs['headers'], **{'x-auth-token': dnac_jwt_token})
+            response = self.session.request(method, url, **kwargs)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """
+        This function will close all the pooled connections
+        :return:
+        """
+        self.session.close()
+
+
+class DnacTokenManager:
+    """
+    DNA C JWT token provider, shared by all the threads and asyncio tasks.
+    The token is requested once, cached, and refreshed in the background {refresh_margin} seconds before it expires.
+    Only one of the concurrent callers requests a new token, the others wait for it
+    """
+
+    def __init__(self, dnac_auth, lifetime=DNAC_TOKEN_LIFETIME, refresh_margin=DNAC_TOKEN_REFRESH_MARGIN,
+                 background_refresh=True):
+        """
+        :param dnac_auth: DNA C Basic Auth
+        :param lifetime: token lifetime in seconds
+        :param refresh_margin: seconds before the token expires when a new token is requested
+        :param background_refresh: if True, a timer thread requests the new token, if False the first caller after
+                                   the refresh time requests it
+        """
+        self.dnac_auth = dnac_auth
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.background_refresh = background_refresh
+        self.lock = threading.Lock()
+        self.token = None
+        self.refresh_time = 0
+        self.expire_time = 0
+        self.timer = None
+
+    def get_token(self):
+        """
+        This function will return the cached token, a new token is requested if the cached token is due for refresh
+        :return: DNA C JWT token
+        """
+        if self.token is None or time.monotonic() >= self.refresh_time:
+            return self.refresh(stale_token=self.token)
+        return self.token
+
+    async def get_token_async(self):
+        """
+        This function will return the cached token, without blocking the event loop if a new token is requested
+        :return: DNA C JWT token
+        """
+        if self.token is None or time.monotonic() >= self.refresh_time:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.get_token)
+        return self.token
+
+    def refresh(self, stale_token=None):
+        """
+        This function will request a new token. If the {stale_token} was already replaced by a concurrent caller, the
+        new cached token is returned and no new token is requested
+        :param stale_token: the token to be replaced
+        :return: DNA C JWT token
+        """
+        with self.lock:
+            if self.token is not None and self.token != stale_token and time.monotonic() < self.refresh_time:
+                return self.token
+            dnac_jwt_token = get_dnac_jwt_token(self.dnac_auth)
+            self.token = dnac_jwt_token
+            self.expire_time = time.monotonic() + self.lifetime
+            self.refresh_time = self.expire_time - self.refresh_margin
+            self.schedule_refresh(self.lifetime - self.refresh_margin)
+            return dnac_jwt_token
+
+    def schedule_refresh(self, delay):
+        """
+        This function will start the timer for the background token refresh
+        :param delay: seconds until the refresh
+        :return:
+        """
+        if not self.background_refresh:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(max(delay, 1), self.background_refresh_token)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def background_refresh_token(self):
+        """
+        This function will request the new token from the timer thread, retrying while the current token is valid
+        :return:
+        """
+        try:
+            self.refresh(stale_token=self.token)
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            if time.monotonic() < self.expire_time:
+                self.schedule_refresh(min(30, self.expire_time - time.monotonic()))
+
+    def invalidate(self):
+        """
+        This function will drop the cached token, the next caller will request a new token
+        :return:
+        """
+        with self.lock:
+            self.token = None
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+
+DNAC_TOKEN = DnacTokenManager(DNAC_AUTH)
+DNAC_CLIENT = DnacClient(token_manager=DNAC_TOKEN)
+
 
 def pprint(json_data):
     """
@@ -44,22 +245,115 @@ def get_dnac_jwt_token(dnac_auth):
 
     url = DNAC_URL + '/dna/system/api/v1/auth/token'
     header = {'content-type': 'application/json'}
-    response = requests.post(url, auth=dnac_auth, headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, auth=dnac_auth, headers=header, verify=False)
     dnac_jwt_token = response.json()['Token']
     return dnac_jwt_token
 
 
 def get_all_device_info(dnac_jwt_token):
     """
-    The function will return all network devices info
+    The function will return all network devices info, collected page by page
     :param dnac_jwt_token: DNA C token
     :return: DNA C device inventory info
     """
-    url = DNAC_URL + '/api/v1/network-device'
+    all_device_info = list(iter_devices(dnac_jwt_token))
+    return all_device_info
+
+
+def get_device_info_page(offset, limit, dnac_jwt_token):
+    """
+    The function will return one page of the network devices info, {limit} devices starting with the index {offset}
+    :param offset: index of the first device, starting with 1
+    :param limit: number of devices to return
+    :param dnac_jwt_token: DNA C token
+    :return: list with the devices info, empty list after the last device
+    """
+    url = DNAC_URL + '/api/v1/network-device/' + str(offset) + '/' + str(limit)
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    page_response = DNAC_CLIENT.get(url, headers=header, verify=False)
+    page_info = page_response.json()
+    return page_info['response']
+
+
+def iter_devices(dnac_jwt_token, page_size=DNAC_PAGE_SIZE, prefetch=False):
+    """
+    The generator will walk the network devices inventory one page at the time, and will yield each device info.
+    Only one page is held in memory, the first device is returned after the first page is downloaded.
+    The walk ends with the first empty page, DNA C may return less than {page_size} devices for any page
+    :param dnac_jwt_token: DNA C token
+    :param page_size: number of devices requested with each call
+    :param prefetch: if True, download the next page while the devices from the current page are consumed
+    :return: device info, one device at the time
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        offset = 1
+        page = get_device_info_page(offset, page_size, dnac_jwt_token)
+        while page:
+            offset += len(page)
+            next_page = None
+            if executor is not None:
+                next_page = executor.submit(get_device_info_page, offset, page_size, dnac_jwt_token)
+            for device in page:
+                yield device
+            if next_page is not None:
+                page = next_page.result()
+            else:
+                page = get_device_info_page(offset, page_size, dnac_jwt_token)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+def iter_device_records(dnac_jwt_token, page_size=DNAC_PAGE_SIZE):
+    """
+    The generator will walk the network devices inventory one page at the time, see {iter_devices}, and will yield a
+    compact record for each device
+    :param dnac_jwt_token: DNA C token
+    :param page_size: number of devices requested with each call
+    :return: records.DeviceRecord, one device at the time
+    """
+    return records.iter_records(records.DeviceRecord, iter_devices(dnac_jwt_token, page_size))
+
+
+def iter_host_records(dnac_jwt_token, page_size=DNAC_PAGE_SIZE):
+    """
+    The generator will walk the clients one page at the time, until the first empty page, and will yield a compact
+    record for each client
+    :param dnac_jwt_token: DNA C token
+    :param page_size: number of clients requested with each call
+    :return: records.HostRecord, one client at the time
+    """
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    offset = 1
+    while True:
+        url = DNAC_URL + '/api/v1/host?offset=' + str(offset) + '&limit=' + str(page_size)
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        page = response.json()['response']
+        if not page:
+            break
+        yield from records.iter_records(records.HostRecord, page)
+        offset += len(page)
+
+
+def iter_interface_records(dnac_jwt_token, page_size=DNAC_PAGE_SIZE):
+    """
+    The generator will walk the network devices interfaces one page at the time, until the first empty page, and will
+    yield a compact record for each interface
+    :param dnac_jwt_token: DNA C token
+    :param page_size: number of interfaces requested with each call
+    :return: records.InterfaceRecord, one interface at the time
+    """
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    all_device_response = requests.get(url, headers=header, verify=False)
-    all_device_info = all_device_response.json()
-    return all_device_info['response']
+    offset = 1
+    while True:
+        url = DNAC_URL + '/api/v1/interface/' + str(offset) + '/' + str(page_size)
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        page = response.json()['response']
+        if not page:
+            break
+        yield from records.iter_records(records.InterfaceRecord, page)
+        offset += len(page)
 
 
 def get_device_info(device_id, dnac_jwt_token):
@@ -71,11 +365,123 @@ def get_device_info(device_id, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/network-device?id=' + device_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    device_response = requests.get(url, headers=header, verify=False)
+    device_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     device_info = device_response.json()
     return device_info['response'][0]
 
 
+class DeviceInventory:
+    """
+    DNA C device inventory cache. The inventory is downloaded once and indexed by hostname, device id, serial number
+    and management IP address, lookups are answered from the indexes.
+    The inventory is downloaded again when older than {ttl} seconds, or after calling {invalidate}, {version} is
+    incremented when a device is added or removed, or the device hostname or management IP address changes, not for
+    the fields updated with each poll, like the up time
+    """
+
+    def __init__(self, ttl=DNAC_INVENTORY_TTL):
+        """
+        :param ttl: cache lifetime in seconds
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.updated = None
+        self.version = 0
+        self.signature = frozenset()
+        self.devices = []
+        self.by_hostname = {}
+        self.by_id = {}
+        self.by_serial_number = {}
+        self.by_management_ip = {}
+
+    def refresh(self, dnac_jwt_token):
+        """
+        This function will download the device inventory and rebuild the indexes
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        devices = get_all_device_info(dnac_jwt_token)
+        by_hostname = {}
+        by_id = {}
+        by_serial_number = {}
+        by_management_ip = {}
+        for device in devices:
+            by_hostname[device.get('hostname')] = device
+            by_id[device.get('id')] = device
+            by_management_ip[device.get('managementIpAddress')] = device
+            for serial_number in (device.get('serialNumber') or '').split(','):  # stacks, "SN1, SN2"
+                by_serial_number[serial_number.strip()] = device
+        signature = frozenset((device.get('id'), device.get('hostname'), device.get('managementIpAddress'))
+                              for device in devices)
+        if signature != self.signature:
+            self.signature = signature
+            self.version += 1
+        self.devices = devices
+        self.by_hostname = by_hostname
+        self.by_id = by_id
+        self.by_serial_number = by_serial_number
+        self.by_management_ip = by_management_ip
+        self.updated = time.monotonic()
+
+    def invalidate(self):
+        """
+        This function will force a new inventory download at the next lookup
+        :return:
+        """
+        self.updated = None
+
+    def check_refresh(self, dnac_jwt_token):
+        """
+        This function will refresh the inventory if never downloaded, invalidated or older than {ttl}.
+        Only one of the concurrent callers will download the inventory
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        if self.updated is None or time.monotonic() - self.updated > self.ttl:
+            with self.lock:
+                if self.updated is None or time.monotonic() - self.updated > self.ttl:
+                    self.refresh(dnac_jwt_token)
+
+    def get_by_hostname(self, device_name, dnac_jwt_token):
+        """
+        :param device_name: device hostname
+        :param dnac_jwt_token: DNA C token
+        :return: device info, or {None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.by_hostname.get(device_name)
+
+    def get_by_id(self, device_id, dnac_jwt_token):
+        """
+        :param device_id: DNA C device id
+        :param dnac_jwt_token: DNA C token
+        :return: device info, or {None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.by_id.get(device_id)
+
+    def get_by_serial_number(self, device_sn, dnac_jwt_token):
+        """
+        :param device_sn: device serial number
+        :param dnac_jwt_token: DNA C token
+        :return: device info, or {None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.by_serial_number.get(device_sn)
+
+    def get_by_management_ip(self, ip_address, dnac_jwt_token):
+        """
+        :param ip_address: device management IP address
+        :param dnac_jwt_token: DNA C token
+        :return: device info, or {None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.by_management_ip.get(ip_address)
+
+
+DEVICE_INVENTORY = DeviceInventory()
+
+
 def delete_device(device_id, dnac_jwt_token):
     """
     This function will delete the device with the {device_id} from the DNA Center inventory
@@ -85,7 +491,8 @@ def delete_device(device_id, dnac_jwt_token):
     """
     url = DNAC_URL + '/dna/intent/api/v1/network-device/' + device_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.delete(url, headers=header, verify=False)
+    response = DNAC_CLIENT.delete(url, headers=header, verify=False)
+    DEVICE_INVENTORY.invalidate()
     delete_response = response.json()
     delete_status = delete_response['response']
     return delete_status
@@ -98,11 +505,7 @@ def get_project_id(project_name, dnac_jwt_token):
     :param dnac_jwt_token: DNA token
     :return: project id
     """
-    url = DNAC_URL + '/api/v1/template-programmer/project?name=' + project_name
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
-    proj_json = response.json()
-    proj_id = proj_json[0]['id']
+    proj_id = TEMPLATE_CATALOG.get_project(project_name, dnac_jwt_token)['id']
     return proj_id
 
 
@@ -115,12 +518,109 @@ def get_project_info(project_name, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/template-programmer/project?name=' + project_name
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     project_json = response.json()
     template_list = project_json[0]['templates']
     return template_list
 
 
+class TemplateCatalog:
+    """
+    DNA C CLI templates catalog cache, keyed by (project name, template name).
+    For each project, the project id, the template ids and the latest version template ids are downloaded once, with
+    two calls. The project is downloaded again when older than {ttl} seconds, after a template create, update, commit
+    or delete, and once when a template name is not found, the template may be created outside this module
+    """
+
+    def __init__(self, ttl=DNAC_TEMPLATE_TTL):
+        """
+        :param ttl: cache lifetime in seconds, for each project
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.projects = {}  # project name: (updated, project info)
+
+    def load_project(self, project_name, dnac_jwt_token):
+        """
+        This function will download the project info and the versions for all the project templates
+        :param project_name: project name
+        :param dnac_jwt_token: DNA C token
+        :return: {'id': project id, 'templates': {template name: {'id': template id, 'version_id': version id}}}
+        """
+        url = DNAC_URL + '/api/v1/template-programmer/project?name=' + project_name
+        header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        project_json = response.json()[0]
+        templates = {}
+        for template in project_json['templates']:
+            templates[template['name']] = {'id': template['id'], 'version_id': None}
+
+        # find the latest version for each template
+        url = DNAC_URL + '/api/v1/template-programmer/template?projectId=' + project_json['id'] + '&includeHead=false'
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        for template in response.json():
+            version = 0
+            version_id = None
+            for ver in template['versionsInfo']:
+                if int(ver['version']) > version:
+                    version_id = ver['id']
+                    version = int(ver['version'])
+            templates.setdefault(template['name'], {'id': None, 'version_id': None})['version_id'] = version_id
+        return {'id': project_json['id'], 'templates': templates}
+
+    def is_valid(self, project_entry):
+        """
+        :param project_entry: (updated, project info), or {None}
+        :return: True if the project is cached and not older than {ttl}
+        """
+        return project_entry is not None and time.monotonic() - project_entry[0] <= self.ttl
+
+    def get_project(self, project_name, dnac_jwt_token, refresh=False):
+        """
+        This function will return the project info, downloaded if not cached or older than {ttl}
+        :param project_name: project name
+        :param dnac_jwt_token: DNA C token
+        :param refresh: if True, download the project info even if cached
+        :return: {'id': project id, 'templates': {template name: {'id': template id, 'version_id': version id}}}
+        """
+        project_entry = self.projects.get(project_name)
+        if refresh or not self.is_valid(project_entry):
+            with self.lock:
+                if refresh or not self.is_valid(self.projects.get(project_name)):
+                    project = self.load_project(project_name, dnac_jwt_token)
+                    self.projects[project_name] = (time.monotonic(), project)
+                project_entry = self.projects[project_name]
+        return project_entry[1]
+
+    def get_template(self, template_name, project_name, dnac_jwt_token):
+        """
+        This function will return the ids for the template with the name {template_name}
+        :param template_name: template name
+        :param project_name: project name
+        :param dnac_jwt_token: DNA C token
+        :return: {'id': template id, 'version_id': latest version template id}, or {None} if not found
+        """
+        template = self.get_project(project_name, dnac_jwt_token)['templates'].get(template_name)
+        if template is None:
+            template = self.get_project(project_name, dnac_jwt_token, refresh=True)['templates'].get(template_name)
+        return template
+
+    def invalidate(self, project_name=None):
+        """
+        This function will remove the project with the name {project_name} from the cache, all projects if {None}
+        :param project_name: project name
+        :return:
+        """
+        with self.lock:
+            if project_name is None:
+                self.projects = {}
+            else:
+                self.projects.pop(project_name, None)
+
+
+TEMPLATE_CATALOG = TemplateCatalog()
+
+
 def create_commit_template(template_name, project_name, cli_template, dnac_jwt_token):
     """
     This function will create and commit a CLI template, under the project with the name {project_name}, with the the text content
@@ -165,7 +665,8 @@ def create_commit_template(template_name, project_name, cli_template, dnac_jwt_t
     # create the new template
     url = DNAC_URL + '/api/v1/template-programmer/project/' + project_id + '/template'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
+    TEMPLATE_CATALOG.invalidate(project_name)
 
     # get the template id
     template_id = get_template_id(template_name, project_name, dnac_jwt_token)
@@ -188,7 +689,8 @@ def commit_template(template_id, comments, dnac_jwt_token):
             "comments": comments
         }
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
+    TEMPLATE_CATALOG.invalidate()  # new template version, the template project is not known
 
 
 def update_commit_template(template_name, project_name, cli_template, dnac_jwt_token):
@@ -232,7 +734,8 @@ def update_commit_template(template_name, project_name, cli_template, dnac_jwt_t
         "parentTemplateId": project_id
     }
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.put(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.put(url, data=json.dumps(payload), headers=header, verify=False)
+    TEMPLATE_CATALOG.invalidate(project_name)
 
     # commit template
     commit_template(template_id, 'committed by Python script', dnac_jwt_token)
@@ -265,7 +768,8 @@ def delete_template(template_name, project_name, dnac_jwt_token):
     template_id = get_template_id(template_name, project_name, dnac_jwt_token)
     url = DNAC_URL + '/api/v1/template-programmer/template/' + template_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.delete(url, headers=header, verify=False)
+    response = DNAC_CLIENT.delete(url, headers=header, verify=False)
+    TEMPLATE_CATALOG.invalidate(project_name)
 
 
 def get_all_template_info(dnac_jwt_token):
@@ -276,7 +780,7 @@ def get_all_template_info(dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/template-programmer/template'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     all_template_list = response.json()
     return all_template_list
 
@@ -292,7 +796,7 @@ def get_template_name_info(template_name, project_name, dnac_jwt_token):
     template_id = get_template_id(template_name, project_name, dnac_jwt_token)
     url = DNAC_URL + '/api/v1/template-programmer/template/' + template_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     template_json = response.json()
     return template_json
 
@@ -306,11 +810,10 @@ def get_template_id(template_name, project_name, dnac_jwt_token):
     :param dnac_jwt_token: DNA C token
     :return: DNA C template id
     """
-    template_list = get_project_info(project_name, dnac_jwt_token)
     template_id = None
-    for template in template_list:
-        if template['name'] == template_name:
-            template_id = template['id']
+    template = TEMPLATE_CATALOG.get_template(template_name, project_name, dnac_jwt_token)
+    if template is not None:
+        template_id = template['id']
     return template_id
 
 
@@ -321,21 +824,12 @@ def get_template_id_version(template_name, project_name, dnac_jwt_token):
     :param template_name: name of the template
     :param project_name: Project name
     :param dnac_jwt_token: DNA C token
-    :return: DNA C template id for the last version
+    :return: DNA C template id for the last version, or {None} if not found
     """
-    project_id = get_project_id(project_name, dnac_jwt_token)
-    url = DNAC_URL + '/api/v1/template-programmer/template?projectId=' + project_id + '&includeHead=false'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
-    project_json = response.json()
-    for template in project_json:
-        if template['name'] == template_name:
-            version = 0
-            versions_info = template['versionsInfo']
-            for ver in versions_info:
-                if int(ver['version']) > version:
-                    template_id_ver = ver['id']
-                    version = int(ver['version'])
+    template_id_ver = None
+    template = TEMPLATE_CATALOG.get_template(template_name, project_name, dnac_jwt_token)
+    if template is not None:
+        template_id_ver = template['version_id']
     return template_id_ver
 
 
@@ -363,7 +857,7 @@ def deploy_template(template_name, project_name, device_name, dnac_jwt_token):
         }
     url = DNAC_URL + '/api/v1/template-programmer/template/deploy'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, headers=header, data=json.dumps(payload), verify=False)
+    response = DNAC_CLIENT.post(url, headers=header, data=json.dumps(payload), verify=False)
     depl_task_id = (response.json())["deploymentId"]
     return depl_task_id
 
@@ -377,12 +871,111 @@ def check_template_deployment_status(depl_task_id, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/template-programmer/template/deploy/status/' + depl_task_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     response_json = response.json()
     deployment_status = response_json["status"]
     return deployment_status
 
 
+def deploy_template_bulk(template_name, project_name, device_name_list, dnac_jwt_token, device_params=None,
+                         max_targets=DNAC_DEPLOY_MAX_TARGETS):
+    """
+    This function will deploy the template with the name {template_name} to all the network devices with the names in
+    the {device_name_list}. The management IP addresses are found with one inventory download, and the devices are
+    packed in deployments with up to {max_targets} targets each
+    :param template_name: template name
+    :param project_name: project name
+    :param device_name_list: list of device hostnames
+    :param dnac_jwt_token: DNA C token
+    :param device_params: optional dict {device_name: {template param: value}}
+    :param max_targets: max number of devices in one deployment
+    :return: dict {device_name: deployment task id}, the deployment id is {None} if the device does not exist
+    :raise ValueError: if the template {template_name} does not exist in the project {project_name}, or it has no
+    committed version
+    """
+    template_id = get_template_id_version(template_name, project_name, dnac_jwt_token)
+    if template_id is None:
+        raise ValueError('DNA C template ' + template_name + ' not found, or not committed, in the project ' +
+                         project_name)
+    device_params = device_params or {}
+    device_deployments = {}
+    target_list = []
+    for device_name in dict.fromkeys(device_name_list):
+        device_management_ip = get_device_management_ip(device_name, dnac_jwt_token)
+        device_deployments[device_name] = None
+        if device_management_ip is not None:
+            target_list.append((device_name, device_management_ip))
+
+    url = DNAC_URL + '/api/v1/template-programmer/template/deploy'
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    for index in range(0, len(target_list), max_targets):
+        targets = target_list[index:index + max_targets]
+        payload = {
+            "templateId": template_id,
+            "targetInfo": [
+                {
+                    "id": device_management_ip,
+                    "type": "MANAGED_DEVICE_IP",
+                    "params": device_params.get(device_name, {})
+                } for device_name, device_management_ip in targets
+            ]
+        }
+        response = DNAC_CLIENT.post(url, headers=header, data=json.dumps(payload), verify=False)
+        depl_task_id = (response.json())["deploymentId"]
+        for device_name, device_management_ip in targets:
+            device_deployments[device_name] = depl_task_id
+    return device_deployments
+
+
+def get_template_deployment_status(depl_task_id, dnac_jwt_token):
+    """
+    This function will return the status for the template deployment with the id {depl_task_id}
+    :param depl_task_id: template deployment id
+    :param dnac_jwt_token: DNA C token
+    :return: status, or {None} if the status is not available
+    """
+    try:
+        deployment_status = check_template_deployment_status(depl_task_id, dnac_jwt_token)
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        deployment_status = None
+    return deployment_status
+
+
+def wait_for_template_deployments(depl_task_id_list, dnac_jwt_token, timeout=DNAC_TASK_TIMEOUT, first_interval=1,
+                                  max_interval=10):
+    """
+    This generator will check all the template deployments with the ids in the {depl_task_id_list} in one polling
+    loop, with exponential backoff, and will return each deployment result as soon as the deployment is completed
+    :param depl_task_id_list: list of template deployment ids
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time, in seconds, for all deployments
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: (deployment id, status - {SUCCESS} or {FAILURE}), in the order of completion
+    :raise TimeoutError: if any of the deployments is not completed in {timeout} seconds
+    """
+    deadline = time.monotonic() + timeout
+    pending_deployments = [depl_task_id for depl_task_id in dict.fromkeys(depl_task_id_list) if depl_task_id]
+    with ThreadPoolExecutor(max_workers=DNAC_POOL_SIZE) as executor:
+        for interval in utils.backoff_intervals(first_interval, max_interval):
+            if not pending_deployments:
+                break
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0:
+                raise TimeoutError('DNA C template deployments not completed in ' + str(timeout) + ' seconds: ' +
+                                   ', '.join(pending_deployments))
+            time.sleep(min(interval, remaining_time))
+            status_list = executor.map(get_template_deployment_status, pending_deployments,
+                                       [dnac_jwt_token] * len(pending_deployments))
+            still_pending = []
+            for depl_task_id, deployment_status in zip(pending_deployments, status_list):
+                if deployment_status in ('SUCCESS', 'FAILURE'):
+                    yield depl_task_id, deployment_status
+                else:
+                    still_pending.append(depl_task_id)
+            pending_deployments = still_pending
+
+
 def get_client_info(client_ip, dnac_jwt_token):
     """
     This function will retrieve all the information from the client with the IP address
@@ -392,7 +985,7 @@ def get_client_info(client_ip, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/host?hostIp=' + client_ip
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     client_json = response.json()
     try:
         client_info = client_json['response'][0]
@@ -428,10 +1021,9 @@ def get_device_id_name(device_name, dnac_jwt_token):
     :return:
     """
     device_id = None
-    device_list = get_all_device_info(dnac_jwt_token)
-    for device in device_list:
-        if device['hostname'] == device_name:
-            device_id = device['id']
+    device = DEVICE_INVENTORY.get_by_hostname(device_name, dnac_jwt_token)
+    if device is not None:
+        device_id = device['id']
     return device_id
 
 
@@ -463,10 +1055,9 @@ def get_device_management_ip(device_name, dnac_jwt_token):
     :return: the management ip address
     """
     device_ip = None
-    device_list = get_all_device_info(dnac_jwt_token)
-    for device in device_list:
-        if device['hostname'] == device_name:
-            device_ip = device['managementIpAddress']
+    device = DEVICE_INVENTORY.get_by_hostname(device_name, dnac_jwt_token)
+    if device is not None:
+        device_ip = device['managementIpAddress']
     return device_ip
 
 
@@ -479,7 +1070,7 @@ def get_device_id_sn(device_sn, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/network-device/serial-number/' + device_sn
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    device_response = requests.get(url, headers=header, verify=False)
+    device_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     device_info = device_response.json()
     device_id = device_info['response']['id']
     return device_id
@@ -495,7 +1086,7 @@ def get_device_location(device_name, dnac_jwt_token):
     device_id = get_device_id_name(device_name, dnac_jwt_token)
     url = DNAC_URL + '/api/v1/group/member/' + device_id + '?groupType=SITE'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    device_response = requests.get(url, headers=header, verify=False)
+    device_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     device_info = (device_response.json())['response']
     device_location = device_info[0]['groupNameHierarchy']
     return device_location
@@ -528,7 +1119,7 @@ def create_site(site_name, dnac_jwt_token):
     }
     url = DNAC_URL + '/api/v1/group'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
 
 
 def get_site_id(site_name, dnac_jwt_token):
@@ -541,7 +1132,7 @@ def get_site_id(site_name, dnac_jwt_token):
     site_id = None
     url = DNAC_URL + '/api/v1/group?groupType=SITE'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    site_response = requests.get(url, headers=header, verify=False)
+    site_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     site_json = site_response.json()
     site_list = site_json['response']
     for site in site_list:
@@ -591,7 +1182,7 @@ def create_building(site_name, building_name, address, dnac_jwt_token):
     }
     url = DNAC_URL + '/api/v1/group'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
 
 
 def get_building_id(building_name, dnac_jwt_token):
@@ -604,7 +1195,7 @@ def get_building_id(building_name, dnac_jwt_token):
     building_id = None
     url = DNAC_URL + '/api/v1/group?groupType=SITE'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    building_response = requests.get(url, headers=header, verify=False)
+    building_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     building_json = building_response.json()
     building_list = building_json['response']
     for building in building_list:
@@ -662,7 +1253,7 @@ def create_floor(building_name, floor_name, floor_number, dnac_jwt_token):
     }
     url = DNAC_URL + '/api/v1/group'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
 
 
 def get_floor_id(building_name, floor_name, dnac_jwt_token):
@@ -678,7 +1269,7 @@ def get_floor_id(building_name, floor_name, dnac_jwt_token):
     building_id = get_building_id(building_name, dnac_jwt_token)
     url = DNAC_URL + '/api/v1/group/' + building_id + '/child?level=1'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    building_response = requests.get(url, headers=header, verify=False)
+    building_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     building_json = building_response.json()
     floor_list = building_json['response']
     for floor in floor_list:
@@ -702,7 +1293,7 @@ def assign_device_sn_building(device_sn, building_name, dnac_jwt_token):
     url = DNAC_URL + '/api/v1/group/' + building_id + '/member'
     payload = {"networkdevice": [device_id]}
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
     print('\nDevice with the SN: ', device_sn, 'assigned to building: ', building_name)
 
 
@@ -721,7 +1312,7 @@ def assign_device_name_building(device_name, building_name, dnac_jwt_token):
     url = DNAC_URL + '/api/v1/group/' + building_id + '/member'
     payload = {"networkdevice": [device_id]}
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
     print('\nDevice with the name: ', device_name, 'assigned to building: ', building_name)
 
 
@@ -751,7 +1342,7 @@ def sync_device(device_name, dnac_jwt_token):
     param = [device_id]
     url = DNAC_URL + '/api/v1/network-device/sync?forceSync=true'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    sync_response = requests.put(url, data=json.dumps(param), headers=header, verify=False)
+    sync_response = DNAC_CLIENT.put(url, data=json.dumps(param), headers=header, verify=False)
     task = sync_response.json()['response']['taskId']
     return sync_response.status_code, task
 
@@ -765,7 +1356,7 @@ def check_task_id_status(task_id, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/task/' + task_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    task_response = requests.get(url, headers=header, verify=False)
+    task_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     task_json = task_response.json()
     task_status = task_json['response']['isError']
     if not task_status:
@@ -777,24 +1368,78 @@ def check_task_id_status(task_id, dnac_jwt_token):
 
 def check_task_id_output(task_id, dnac_jwt_token):
     """
-    This function will check the status of the task with the id {task_id}. Loop one seconds increments until task is completed
+    This function will wait for the task with the id {task_id} to complete, and return the task info
     :param task_id: task id
     :param dnac_jwt_token: DNA C token
-    :return: status - {SUCCESS} or {FAILURE}
+    :return: task info, includes {endTime}, {isError}, {progress}
+    """
+    return wait_for_task(task_id, dnac_jwt_token)
+
+
+def get_task_info(task_id, dnac_jwt_token):
+    """
+    This function will return the task info for the task with the id {task_id}
+    :param task_id: task id
+    :param dnac_jwt_token: DNA C token
+    :return: task info, or {None} if the task info is not available
     """
     url = DNAC_URL + '/api/v1/task/' + task_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    completed = 'no'
-    while completed == 'no':
-        try:
-            task_response = requests.get(url, headers=header, verify=False)
-            task_json = task_response.json()
-            task_output = task_json['response']
-            task_output['endTime']
-            completed = 'yes'
-        except:
-            time.sleep(1)
-    return task_output
+    try:
+        task_response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        task_info = task_response.json()['response']
+    except (requests.exceptions.RequestException, ValueError, KeyError):
+        task_info = None
+    return task_info
+
+
+def wait_for_tasks(task_id_list, dnac_jwt_token, timeout=DNAC_TASK_TIMEOUT, first_interval=0.2, max_interval=5):
+    """
+    This function will wait for all the tasks with the ids in the {task_id_list} to complete, using one polling loop.
+    The first check is after {first_interval} seconds, the interval between checks doubles up to {max_interval}
+    :param task_id_list: list of task ids
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time, in seconds, for all tasks
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: dict {task_id: task info}
+    :raise TimeoutError: if any of the tasks is not completed in {timeout} seconds
+    """
+    deadline = time.monotonic() + timeout
+    pending_tasks = list(dict.fromkeys(task_id_list))
+    completed_tasks = {}
+    with ThreadPoolExecutor(max_workers=DNAC_POOL_SIZE) as executor:
+        for interval in utils.backoff_intervals(first_interval, max_interval):
+            if not pending_tasks:
+                break
+            remaining_time = deadline - time.monotonic()
+            if remaining_time <= 0:
+                raise TimeoutError('DNA C tasks not completed in ' + str(timeout) + ' seconds: ' +
+                                   ', '.join(pending_tasks))
+            time.sleep(min(interval, remaining_time))
+            task_info_list = executor.map(get_task_info, pending_tasks, [dnac_jwt_token] * len(pending_tasks))
+            still_pending = []
+            for task_id, task_info in zip(pending_tasks, task_info_list):
+                if task_info is not None and 'endTime' in task_info:
+                    completed_tasks[task_id] = task_info
+                else:
+                    still_pending.append(task_id)
+            pending_tasks = still_pending
+    return completed_tasks
+
+
+def wait_for_task(task_id, dnac_jwt_token, timeout=DNAC_TASK_TIMEOUT, first_interval=0.2, max_interval=5):
+    """
+    This function will wait for the task with the id {task_id} to complete, see {wait_for_tasks}
+    :param task_id: task id
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time, in seconds
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: task info
+    :raise TimeoutError: if the task is not completed in {timeout} seconds
+    """
+    return wait_for_tasks([task_id], dnac_jwt_token, timeout, first_interval, max_interval)[task_id]
 
 
 def create_path_trace(src_ip, dest_ip, dnac_jwt_token):
@@ -815,7 +1460,7 @@ def create_path_trace(src_ip, dest_ip, dnac_jwt_token):
 
     url = DNAC_URL + '/api/v1/flow-analysis'
     header = {'accept': 'application/json', 'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    path_response = requests.post(url, data=json.dumps(param), headers=header, verify=False)
+    path_response = DNAC_CLIENT.post(url, data=json.dumps(param), headers=header, verify=False)
     path_json = path_response.json()
     path_id = path_json['response']['flowAnalysisId']
     return path_id
@@ -831,7 +1476,7 @@ def get_path_trace_info(path_id, dnac_jwt_token):
 
     url = DNAC_URL + '/api/v1/flow-analysis/' + path_id
     header = {'accept': 'application/json', 'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    path_response = requests.get(url, headers=header, verify=False)
+    path_response = DNAC_CLIENT.get(url, headers=header, verify=False)
     path_json = path_response.json()
     path_info = path_json['response']
     path_status = path_info['request']['status']
@@ -856,6 +1501,142 @@ def get_path_trace_info(path_id, dnac_jwt_token):
     return path_status, path_list
 
 
+def delete_path_trace(path_id, dnac_jwt_token):
+    """
+    This function will delete the path visualisation with the {path_id}
+    :param path_id: DNA C path visualisation id
+    :param dnac_jwt_token: DNA C token
+    :return: Status code - 202 - deleted
+    """
+
+    url = DNAC_URL + '/api/v1/flow-analysis/' + path_id
+    header = {'accept': 'application/json', 'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    path_response = DNAC_CLIENT.delete(url, headers=header, verify=False)
+    path_status_code = path_response.status_code
+    return path_status_code
+
+
+def run_path_traces(flow_list, dnac_jwt_token, delete=True, max_active=DNAC_POOL_SIZE, timeout=120):
+    """
+    This function will run a path trace for each flow in the {flow_list}, see utils.run_path_traces
+    :param flow_list: list of (source IP address, destination IP address)
+    :param dnac_jwt_token: DNA C token
+    :param delete: if True, all the created path traces are deleted at the end
+    :param max_active: max number of path traces in progress
+    :param timeout: max wait time, in seconds, for each path trace
+    :return: iterator of (src_ip, dest_ip, path_id, path_status, path_list), as soon as each path trace is done
+    """
+    return utils.run_path_traces(flow_list, create_path_trace, get_path_trace_info, dnac_jwt_token,
+                                 delete_path_trace if delete else None, max_active, timeout)
+
+
+class PathTraceCache:
+    """
+    DNA C path trace results cache, keyed by (source IP address, destination IP address).
+    Only the completed path traces are cached, for {ttl} seconds, the least recently used results are evicted when
+    more than {max_size}. The results are also invalidated when the physical topology or the device inventory
+    versions change. The topology and the inventory are refreshed, if older than their TTL, for each get and put,
+    a cache hit is stale at most {DNAC_TOPOLOGY_TTL} or {DNAC_INVENTORY_TTL} seconds after a topology or inventory
+    change
+    """
+
+    def __init__(self, ttl=DNAC_PATH_TRACE_TTL, max_size=DNAC_PATH_TRACE_CACHE_SIZE):
+        """
+        :param ttl: path trace result lifetime in seconds
+        :param max_size: max number of path trace results
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.results = collections.OrderedDict()  # (src_ip, dest_ip): (updated, versions, path_status, path_list)
+
+    @staticmethod
+    def get_versions(dnac_jwt_token):
+        """
+        This function will refresh the physical topology and the device inventory, if older than their TTL
+        :param dnac_jwt_token: DNA C token
+        :return: the physical topology and device inventory versions
+        """
+        PHYSICAL_TOPOLOGY.check_refresh(dnac_jwt_token)
+        DEVICE_INVENTORY.check_refresh(dnac_jwt_token)
+        return PHYSICAL_TOPOLOGY.version, DEVICE_INVENTORY.version
+
+    def get(self, src_ip, dest_ip, dnac_jwt_token):
+        """
+        :param src_ip: Source IP address
+        :param dest_ip: Destination IP address
+        :param dnac_jwt_token: DNA C token
+        :return: Path visualisation status and details, or {None} if not cached, expired or invalidated
+        """
+        versions = self.get_versions(dnac_jwt_token)
+        with self.lock:
+            result = self.results.get((src_ip, dest_ip))
+            if result is None:
+                return None
+            if time.monotonic() - result[0] > self.ttl or result[1] != versions:
+                del self.results[(src_ip, dest_ip)]
+                return None
+            self.results.move_to_end((src_ip, dest_ip))
+            return result[2], result[3]
+
+    def put(self, src_ip, dest_ip, path_status, path_list, dnac_jwt_token):
+        """
+        :param src_ip: Source IP address
+        :param dest_ip: Destination IP address
+        :param path_status: Path visualisation status, only {COMPLETED} results are cached
+        :param path_list: Path visualisation details
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        if path_status != 'COMPLETED':
+            return
+        versions = self.get_versions(dnac_jwt_token)
+        with self.lock:
+            self.results[(src_ip, dest_ip)] = (time.monotonic(), versions, path_status, path_list)
+            self.results.move_to_end((src_ip, dest_ip))
+            while len(self.results) > self.max_size:
+                self.results.popitem(last=False)
+
+    def invalidate(self, src_ip=None, dest_ip=None):
+        """
+        This function will remove the result for the flow {src_ip}, {dest_ip}, or all the results if {None}
+        :param src_ip: Source IP address
+        :param dest_ip: Destination IP address
+        :return:
+        """
+        with self.lock:
+            if src_ip is None and dest_ip is None:
+                self.results.clear()
+            else:
+                self.results.pop((src_ip, dest_ip), None)
+
+
+PATH_TRACE_CACHE = PathTraceCache()
+
+
+def get_path_trace(src_ip, dest_ip, dnac_jwt_token, timeout=120):
+    """
+    This function will return the path trace between the source IP address {src_ip} and the destination IP
+    address {dest_ip}, from the path trace cache if available. If not, a new path trace is created, polled until
+    done, cached if completed, and deleted
+    :param src_ip: Source IP address
+    :param dest_ip: Destination IP address
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time, in seconds, for a new path trace
+    :return: Path visualisation status, and the details in a list [device,interface_out,interface_in,device...]
+    """
+    path_trace = PATH_TRACE_CACHE.get(src_ip, dest_ip, dnac_jwt_token)
+    if path_trace is not None:
+        return path_trace
+    path_id = create_path_trace(src_ip, dest_ip, dnac_jwt_token)
+    try:
+        path_status, path_list = utils.wait_for_path_trace(path_id, get_path_trace_info, dnac_jwt_token, timeout)
+    finally:
+        delete_path_trace(path_id, dnac_jwt_token)
+    PATH_TRACE_CACHE.put(src_ip, dest_ip, path_status, path_list, dnac_jwt_token)
+    return path_status, path_list
+
+
 def check_ipv4_network_interface(ip_address, dnac_jwt_token):
     """
     This function will check if the provided IPv4 address is configured on any network interfaces
@@ -865,7 +1646,7 @@ def check_ipv4_network_interface(ip_address, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/interface/ip-address/' + ip_address
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     response_json = response.json()
     try:
         response_info = response_json['response'][0]
@@ -889,7 +1670,7 @@ def get_device_info_ip(ip_address, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/network-device/ip-address/' + ip_address
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     response_json = response.json()
     device_info = response_json['response']
     if 'errorCode' == 'Not found':
@@ -906,7 +1687,7 @@ def get_legit_cli_command_runner(dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/network-device-poller/cli/legit-reads'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     response_json = response.json()
     cli_list = response_json['response']
     return cli_list
@@ -914,18 +1695,96 @@ def get_legit_cli_command_runner(dnac_jwt_token):
 
 def get_content_file_id(file_id, dnac_jwt_token):
     """
-    This function will download a file specified by the {file_id}
+    This function will download a file specified by the {file_id}. The entire file is loaded in memory, for
+    large files use {iter_content_file_id} or {download_content_file_id}
     :param file_id: file id
     :param dnac_jwt_token: DNA C token
     :return: file
     """
     url = DNAC_URL + '/api/v1/file/' + file_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False, stream=True)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     response_json = response.json()
     return response_json
 
 
+def open_content_file_id(file_id, dnac_jwt_token, timeout=DNAC_FILE_TIMEOUT, first_interval=0.1, max_interval=1):
+    """
+    This function will start the streaming download of the file specified by the {file_id}, retrying with
+    exponential backoff until the file is ready. Only the response headers are received, the caller reads the
+    content, and closes the response
+    :param file_id: file id
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time for the file, in seconds
+    :param first_interval: wait time after the first failed download, in seconds
+    :param max_interval: max wait time between downloads, in seconds
+    :return: streamed response
+    :raise TimeoutError: if the file is not ready in {timeout} seconds
+    """
+    url = DNAC_URL + '/api/v1/file/' + file_id
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    deadline = time.monotonic() + timeout
+    for interval in utils.backoff_intervals(first_interval, max_interval):
+        try:
+            response = DNAC_CLIENT.get(url, headers=header, verify=False, stream=True)
+            if response.status_code == 200:
+                return response
+            response.close()
+        except requests.exceptions.RequestException:
+            pass
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+            raise TimeoutError('DNA C file ' + file_id + ' not ready in ' + str(timeout) + ' seconds')
+        time.sleep(min(interval, remaining_time))
+
+
+def wait_for_content_file_id(file_id, dnac_jwt_token, timeout=DNAC_FILE_TIMEOUT):
+    """
+    This function will download the file specified by the {file_id}, waiting until the file is ready
+    :param file_id: file id
+    :param dnac_jwt_token: DNA C token
+    :param timeout: max wait time for the file, in seconds
+    :return: file
+    :raise TimeoutError: if the file is not ready in {timeout} seconds
+    """
+    with open_content_file_id(file_id, dnac_jwt_token, timeout) as response:
+        return response.json()
+
+
+def iter_content_file_id(file_id, dnac_jwt_token, chunk_size=DNAC_FILE_CHUNK_SIZE, timeout=DNAC_FILE_TIMEOUT):
+    """
+    This generator will stream the JSON array file specified by the {file_id}, and will return each array element as
+    soon as it is decoded. For the command runner files, each element is the {deviceUuid} and {commandResponses}
+    for one device
+    :param file_id: file id
+    :param dnac_jwt_token: DNA C token
+    :param chunk_size: size of the chunks read from the network, bytes
+    :param timeout: max wait time for the file, in seconds
+    :return: file array elements, one at the time
+    """
+    with open_content_file_id(file_id, dnac_jwt_token, timeout) as response:
+        yield from utils.iter_json_array(response.iter_content(chunk_size))
+
+
+def download_content_file_id(file_id, file_name, dnac_jwt_token, chunk_size=DNAC_FILE_CHUNK_SIZE,
+                             timeout=DNAC_FILE_TIMEOUT):
+    """
+    This function will stream the file specified by the {file_id} to the local file {file_name}.
+    The saved file may be decoded later with utils.iter_json_array
+    :param file_id: file id
+    :param file_name: local file name
+    :param dnac_jwt_token: DNA C token
+    :param chunk_size: size of the chunks read from the network, bytes
+    :param timeout: max wait time for the file, in seconds
+    :return: the local file name
+    """
+    with open_content_file_id(file_id, dnac_jwt_token, timeout) as response:
+        with open(file_name, 'wb') as output_file:
+            for chunk in response.iter_content(chunk_size):
+                output_file.write(chunk)
+    return file_name
+
+
 def get_output_command_runner(command, device_name, dnac_jwt_token):
     """
     This function will return the output of the CLI command specified in the {command}, sent to the device with the
@@ -933,40 +1792,97 @@ def get_output_command_runner(command, device_name, dnac_jwt_token):
     :param command: CLI command
     :param device_name: device hostname
     :param dnac_jwt_token: DNA C token
-    :return: file with the command output
+    :return: the command output, or {None} if the device does not exist or the command runner task failed
     """
+    command_output = None
+    for device_command, output in get_output_command_runner_bulk([command], [device_name], dnac_jwt_token):
+        command_output = output
+    return command_output
 
-    # get the DNA C device id
-    device_id = get_device_id_name(device_name, dnac_jwt_token)
 
-    # get the DNA C task id that will process the CLI command runner
+def create_command_runner_task(command_list, device_id_list, dnac_jwt_token):
+    """
+    This function will send one command runner read-request, for all the commands in the {command_list} and all
+    the devices in the {device_id_list}
+    :param command_list: list of CLI commands
+    :param device_id_list: list of DNA C device ids
+    :param dnac_jwt_token: DNA C token
+    :return: DNA C task id
+    """
     payload = {
-        "commands": [command],
-        "deviceUuids": [device_id],
+        "commands": command_list,
+        "deviceUuids": device_id_list,
         "timeout": 0
         }
     url = DNAC_URL + '/api/v1/network-device-poller/cli/read-request'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, data=json.dumps(payload), headers=header, verify=False)
+    response = DNAC_CLIENT.post(url, data=json.dumps(payload), headers=header, verify=False)
     response_json = response.json()
     task_id = response_json['response']['taskId']
+    return task_id
 
-    # get task id status
-    task_result = check_task_id_output(task_id, dnac_jwt_token)
-    file_info = json.loads(task_result['progress'])
-    file_id = file_info['fileId']
-
-    # get output from file
-    time.sleep(2)  # wait for a second for the file to be ready
-    file_output = get_content_file_id(file_id, dnac_jwt_token)
-    command_responses = file_output[0]['commandResponses']
-    if command_responses['SUCCESS'] is not {}:
-        command_output = command_responses['SUCCESS'][command]
-    elif command_responses['FAILURE'] is not {}:
-        command_output = command_responses['FAILURE'][command]
-    else:
-        command_output = command_responses['BLACKLISTED'][command]
-    return command_output
+
+def get_output_command_runner_bulk(command_list, device_name_list, dnac_jwt_token,
+                                   max_commands=DNAC_CLI_MAX_COMMANDS, max_devices=DNAC_CLI_MAX_DEVICES,
+                                   timeout=DNAC_TASK_TIMEOUT):
+    """
+    This generator will send all the CLI commands in the {command_list} to all the devices in the
+    {device_name_list}. Commands and devices are packed in as few read-requests as allowed by the
+    {max_commands} and {max_devices} limits, all the tasks are waited for in one polling loop, and the result
+    files are streamed and decoded one device at the time
+    :param command_list: list of CLI commands
+    :param device_name_list: list of device hostnames
+    :param dnac_jwt_token: DNA C token
+    :param max_commands: max number of commands in one read-request
+    :param max_devices: max number of devices in one read-request
+    :param timeout: max wait time for all the tasks, in seconds
+    :return: ((device_name, command), command output), output is {None} if the device does not exist, the task
+             failed, or the device and command are missing from the result file
+    """
+    device_names = {}
+    for device_name in dict.fromkeys(device_name_list):
+        device_id = get_device_id_name(device_name, dnac_jwt_token)
+        if device_id is None:
+            for command in command_list:
+                yield (device_name, command), None
+        else:
+            device_names[device_id] = device_name
+
+    # send the read-requests
+    device_id_list = list(device_names)
+    task_batches = {}
+    for command_index in range(0, len(command_list), max_commands):
+        commands = command_list[command_index:command_index + max_commands]
+        for device_index in range(0, len(device_id_list), max_devices):
+            device_ids = device_id_list[device_index:device_index + max_devices]
+            task_id = create_command_runner_task(commands, device_ids, dnac_jwt_token)
+            task_batches[task_id] = (commands, device_ids)
+
+    # wait for all tasks, and collect the output from each result file
+    task_results = wait_for_tasks(list(task_batches), dnac_jwt_token, timeout=timeout)
+    for task_id, (commands, device_ids) in task_batches.items():
+        task_result = task_results[task_id]
+        if task_result.get('isError'):
+            for device_id in device_ids:
+                for command in commands:
+                    yield (device_names[device_id], command), None
+            continue
+        file_id = json.loads(task_result['progress'])['fileId']
+        answered = set()
+        for device_output in iter_content_file_id(file_id, dnac_jwt_token):
+            device_id = device_output['deviceUuid']
+            device_name = device_names.get(device_id)
+            command_responses = device_output['commandResponses']
+            for status in ('SUCCESS', 'FAILURE', 'BLACKLISTED'):
+                for command, output in command_responses.get(status, {}).items():
+                    answered.add((device_id, command))
+                    yield (device_name, command), output
+
+        # the devices and commands sent in the read-request, missing from the result file
+        for device_id in device_ids:
+            for command in commands:
+                if (device_id, command) not in answered:
+                    yield (device_names[device_id], command), None
 
 
 def get_all_configs(dnac_jwt_token):
@@ -977,12 +1893,29 @@ def get_all_configs(dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/network-device/config'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     config_json = response.json()
     config_files = config_json['response']
     return config_files
 
 
+def analyze_all_configs(dnac_jwt_token, workers=None):
+    """
+    This function will download all the devices configurations and analyze them using all the CPUs, see
+    utils.analyze_configs
+    :param dnac_jwt_token: DNA C token
+    :param workers: number of worker processes, default is the number of CPUs
+    :return: report dict with the IPv4 addresses for each device, all addresses, and the duplicate addresses,
+             devices identified by hostname
+    """
+    config_list = []
+    for config in get_all_configs(dnac_jwt_token):
+        device = DEVICE_INVENTORY.get_by_id(config['id'], dnac_jwt_token)
+        device_name = device['hostname'] if device is not None else config['id']
+        config_list.append((device_name, config['runningConfig']))
+    return utils.analyze_configs(config_list, workers)
+
+
 def get_device_config(device_name, dnac_jwt_token):
     """
     This function will get the configuration file for the device with the name {device_name}
@@ -993,7 +1926,7 @@ def get_device_config(device_name, dnac_jwt_token):
     device_id = get_device_id_name(device_name, dnac_jwt_token)
     url = DNAC_URL + '/api/v1/network-device/' + device_id + '/config'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     config_json = response.json()
     config_file = config_json['response']
     return config_file
@@ -1023,23 +1956,177 @@ def check_ipv4_address(ipv4_address, dnac_jwt_token):
 
 def check_ipv4_address_configs(ipv4_address, dnac_jwt_token):
     """
-    This function will verify if the IPv4 address is present in any of the configurations of any devices
+    This function will verify if the IPv4 address is present in any of the configurations of any devices.
+    The address is searched in the device configurations address index, exact match
     :param ipv4_address: IPv4 address
     :param dnac_jwt_token: DNA C token
     :return: True/False
     """
-    url = DNAC_URL + '/api/v1/network-device/config'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
-    config_json = response.json()
-    config_files = config_json['response']
-    for config in config_files:
-        run_config = config['runningConfig']
-        if ipv4_address in run_config:
-            return True
+    if CONFIG_ADDRESS_INDEX.lookup(ipv4_address, dnac_jwt_token):
+        return True
     return False
 
 
+def parse_config_ipv4_addresses(run_config):
+    """
+    This function will find all the IPv4 addresses present in the configuration {run_config}, and the interface
+    configuration section that includes them
+    :param run_config: device configuration
+    :return: list of (ipv4_address, interface_name or None, line_number)
+    """
+    address_list = []
+    interface_name = None
+    for line_number, line in enumerate(run_config.splitlines(), start=1):
+        if not line or line[0] == '!':
+            continue
+        if line[0] != ' ':  # a new configuration section
+            interface_name = line.split()[1] if line.startswith('interface ') else None
+        if '.' in line:
+            for ipv4_address in utils.IPV4_ADDRESS_PATTERN.findall(line):
+                address_list.append((ipv4_address, interface_name, line_number))
+    return address_list
+
+
+class ConfigAddressIndex:
+    """
+    Index of all the IPv4 addresses present in the devices configurations, built from the running configs
+    downloaded once. Each address is mapped to a list of (device id, interface name, line number), an address
+    lookup is a dict lookup, exact match - "10.1.1.1" does not match "10.1.1.10".
+    The index is rebuilt when older than {ttl} seconds, or after {invalidate}, one device is updated using
+    {refresh_device}. The index may be saved to a file, and loaded by a new process with {save} and {load}
+    """
+
+    def __init__(self, ttl=DNAC_CONFIG_INDEX_TTL):
+        """
+        :param ttl: index lifetime in seconds
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.updated = None
+        self.addresses = {}
+        self.device_addresses = {}
+
+    def add_device(self, device_id, run_config):
+        """
+        This function will replace in the index all the addresses for the device with the {device_id}
+        :param device_id: DNA C device id
+        :param run_config: device configuration
+        :return:
+        """
+        self.remove_device(device_id)
+        device_addresses = set()
+        for ipv4_address, interface_name, line_number in parse_config_ipv4_addresses(run_config):
+            self.addresses.setdefault(ipv4_address, []).append((device_id, interface_name, line_number))
+            device_addresses.add(ipv4_address)
+        self.device_addresses[device_id] = device_addresses
+
+    def remove_device(self, device_id):
+        """
+        This function will remove from the index all the addresses for the device with the {device_id}
+        :param device_id: DNA C device id
+        :return:
+        """
+        for ipv4_address in self.device_addresses.pop(device_id, ()):
+            entries = [entry for entry in self.addresses[ipv4_address] if entry[0] != device_id]
+            if entries:
+                self.addresses[ipv4_address] = entries
+            else:
+                del self.addresses[ipv4_address]
+
+    def refresh(self, dnac_jwt_token):
+        """
+        This function will download all the devices configurations and rebuild the index. The new index is built
+        separately, the lookups use the previous index until the new index is complete
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        config_files = get_all_configs(dnac_jwt_token)
+        index = ConfigAddressIndex(self.ttl)
+        for config in config_files:
+            index.add_device(config['id'], config['runningConfig'])
+        with self.lock:
+            self.addresses = index.addresses
+            self.device_addresses = index.device_addresses
+            self.updated = time.time()
+
+    def refresh_device(self, device_id, dnac_jwt_token):
+        """
+        This function will download the configuration for the device with the {device_id} and update the index
+        :param device_id: DNA C device id
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        url = DNAC_URL + '/api/v1/network-device/' + device_id + '/config'
+        header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        run_config = response.json()['response']
+        with self.lock:
+            self.add_device(device_id, run_config)
+
+    def invalidate(self):
+        """
+        This function will force a new index build at the next lookup
+        :return:
+        """
+        self.updated = None
+
+    def check_refresh(self, dnac_jwt_token):
+        """
+        This function will rebuild the index if never built, invalidated or older than {ttl}.
+        Only one of the concurrent callers will download the configurations
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        if self.updated is None or time.time() - self.updated > self.ttl:
+            with self.refresh_lock:
+                if self.updated is None or time.time() - self.updated > self.ttl:
+                    self.refresh(dnac_jwt_token)
+
+    def lookup(self, ipv4_address, dnac_jwt_token):
+        """
+        This function will find where the IPv4 address is configured, the index is rebuilt if expired
+        :param ipv4_address: IPv4 address
+        :param dnac_jwt_token: DNA C token
+        :return: list of (device id, interface name or None, line number), empty list if not configured
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.addresses.get(ipv4_address, [])
+
+    def save(self, file_name):
+        """
+        This function will save the index to the JSON file {file_name}
+        :param file_name: file name
+        :return:
+        """
+        with self.lock:
+            index_json = {'updated': self.updated, 'addresses': self.addresses}
+            with open(file_name, 'w') as index_file:
+                json.dump(index_json, index_file)
+
+    def load(self, file_name):
+        """
+        This function will load the index from the JSON file {file_name}, the index keeps the original build time
+        :param file_name: file name
+        :return:
+        """
+        with open(file_name, 'r') as index_file:
+            index_json = json.load(index_file)
+        addresses = {}
+        device_addresses = {}
+        for ipv4_address, entries in index_json['addresses'].items():
+            addresses[ipv4_address] = [tuple(entry) for entry in entries]
+            for entry in entries:
+                device_addresses.setdefault(entry[0], set()).add(ipv4_address)
+        with self.lock:
+            self.addresses = addresses
+            self.device_addresses = device_addresses
+            self.updated = index_json['updated']
+
+
+CONFIG_ADDRESS_INDEX = ConfigAddressIndex()
+
+
 def check_ipv4_duplicate(config_file):
     """
     This function will:
@@ -1050,6 +2137,7 @@ def check_ipv4_duplicate(config_file):
       - Determine if deploying the configuration file will create an IP duplicate
     :param config_file: configuration file name
     :return True/False
+    :raise requests.exceptions.RequestException, ValueError: if no duplicate was found, and any of the lookups failed
     """
 
     # open file with the template
@@ -1060,37 +2148,150 @@ def check_ipv4_duplicate(config_file):
 
     ipv4_address_list = utils.identify_ipv4_address(cli_config)
 
-    # get the DNA Center Auth token
+    # get the DNA Center Auth token, cached by the module token manager
 
-    dnac_token = get_dnac_jwt_token(DNAC_AUTH)
+    dnac_token = DNAC_TOKEN.get_token()
 
-    # check each address against network devices and clients database
-    # initialize duplicate_ip
+    # check all addresses against network devices and clients database
 
-    duplicate_ip = False
-    for ipv4_address in ipv4_address_list:
+    ipv4_verdicts = check_ipv4_duplicate_bulk(ipv4_address_list, dnac_token)
+    for verdict in ipv4_verdicts.values():
+        if verdict['duplicate']:
+            return True
+    for verdict in ipv4_verdicts.values():
+        if verdict['error'] is not None:
+            raise verdict['error']  # an address not checked may be a duplicate
+    return False
 
-        # check against network devices interfaces
 
-        try:
-            device_info = check_ipv4_network_interface(ipv4_address, dnac_token)
-            duplicate_ip = True
-        except:
-            pass
+def find_ipv4_network_interface(ip_address, dnac_jwt_token):
+    """
+    This function will find the network device interface, or the device management IP, for the {ip_address}.
+    The device hostname is found in the inventory cache, one DNA C call for each address
+    :param ip_address: IPv4 address
+    :param dnac_jwt_token: DNA C token
+    :return: device_hostname and interface_name, interface_name is '' for a management IP, or {None} if not found
+    :raise requests.exceptions.RequestException, ValueError: if the lookup failed, DNA C not reachable, HTTP error
+    other than 404 Not Found, or invalid JSON
+    """
+    url = DNAC_URL + '/api/v1/interface/ip-address/' + ip_address
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
+    if response.status_code != 404:
+        response.raise_for_status()
+        interface_list = response.json().get('response')
+        if isinstance(interface_list, list) and interface_list:
+            device = DEVICE_INVENTORY.get_by_id(interface_list[0]['deviceId'], dnac_jwt_token)
+            device_hostname = device['hostname'] if device is not None else None
+            return device_hostname, interface_list[0]['portName']
+    device = DEVICE_INVENTORY.get_by_management_ip(ip_address, dnac_jwt_token)  # required for AP's
+    if device is not None:
+        return device['hostname'], ''
+    return None
+
+
+def find_ipv4_client(ip_address, dnac_jwt_token):
+    """
+    This function will find the client with the IP address {ip_address}
+    :param ip_address: IPv4 address
+    :param dnac_jwt_token: DNA C token
+    :return: client info, or {None} if not found
+    :raise requests.exceptions.RequestException, ValueError: if the lookup failed, DNA C not reachable, HTTP error
+    other than 404 Not Found, or invalid JSON
+    """
+    url = DNAC_URL + '/api/v1/host?hostIp=' + ip_address
+    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    client_list = response.json().get('response')
+    if isinstance(client_list, list) and client_list:
+        return client_list[0]
+    return None
 
-        # check against any hosts
 
-        try:
-            client_info = get_client_info(ipv4_address, dnac_token)
-            if client_info is not None:
-                duplicate_ip = True
-        except:
-            pass
+def check_ipv4_duplicate_bulk(ipv4_address_list, dnac_jwt_token, max_workers=DNAC_POOL_SIZE):
+    """
+    This function will check concurrently if the IPv4 addresses are configured on any network interfaces or used by
+    any hosts. Each address is checked once, the network interface and the host lookups are sent in parallel, the
+    device hostnames are found in the inventory cache
+    :param ipv4_address_list: list of IPv4 addresses, may include duplicates
+    :param dnac_jwt_token: DNA C token
+    :param max_workers: max number of concurrent DNA C calls
+    :return: dict {ipv4_address: verdict}, verdict is a dict with the keys:
+             duplicate - True/False, False is not reliable if {error} is not {None}
+             sources - list of the matches, {interface} network device interface or management IP, {host} client
+             device, interface - device hostname and interface name for the {interface} match, or None
+             client - client info for the {host} match, or None
+             error - the exception for the first failed lookup, or None if both lookups completed
+    """
+    ipv4_addresses = list(dict.fromkeys(ipv4_address_list))  # remove duplicates, keep the order
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        interface_checks = {}
+        host_checks = {}
+        for ipv4_address in ipv4_addresses:
+            interface_checks[ipv4_address] = executor.submit(find_ipv4_network_interface, ipv4_address,
+                                                             dnac_jwt_token)
+            host_checks[ipv4_address] = executor.submit(find_ipv4_client, ipv4_address, dnac_jwt_token)
+
+        ipv4_verdicts = {}
+        for ipv4_address in ipv4_addresses:
+            verdict = {'duplicate': False, 'sources': [], 'device': None, 'interface': None, 'client': None,
+                       'error': None}
+
+            # check against network devices interfaces
+            try:
+                interface_info = interface_checks[ipv4_address].result()
+                if interface_info is not None:
+                    verdict['device'], verdict['interface'] = interface_info
+                    verdict['sources'].append('interface')
+            except (requests.exceptions.RequestException, ValueError, KeyError) as error:
+                verdict['error'] = error
+
+            # check against any hosts
+            try:
+                client_info = host_checks[ipv4_address].result()
+                if client_info is not None:
+                    verdict['client'] = client_info
+                    verdict['sources'].append('host')
+            except (requests.exceptions.RequestException, ValueError, KeyError) as error:
+                verdict['error'] = verdict['error'] or error
 
-    if duplicate_ip:
-        return True
-    else:
-        return False
+            verdict['duplicate'] = bool(verdict['sources'])
+            ipv4_verdicts[ipv4_address] = verdict
+    return ipv4_verdicts
+
+
+def build_subnet_index(dnac_jwt_token):
+    """
+    This function will build the index of all the interface prefixes configured on all devices
+    :param dnac_jwt_token: DNA C token
+    :return: utils.SubnetIndex, devices identified by hostname
+    """
+    subnet_index = utils.SubnetIndex()
+    for config in get_all_configs(dnac_jwt_token):
+        device = DEVICE_INVENTORY.get_by_id(config['id'], dnac_jwt_token)
+        device_name = device['hostname'] if device is not None else config['id']
+        subnet_index.add_config(device_name, config['runningConfig'])
+    return subnet_index
+
+
+def check_ipv4_subnet_overlap(config_file, dnac_jwt_token, subnet_index=None, across_vrfs=False):
+    """
+    This function will find if any of the interface prefixes from the configuration file {config_file} overlap any
+    of the prefixes configured on the network devices
+    :param config_file: configuration file name
+    :param dnac_jwt_token: DNA C token
+    :param subnet_index: utils.SubnetIndex, if {None} the index is built from all the devices configurations
+    :param across_vrfs: if True, check each prefix against the prefixes from all the VRFs
+    :return: list of (IPv4ConfigAddress, list of (vrf, prefix, device, interface)), empty if no overlaps
+    """
+    with open(config_file, 'r') as cli_file:
+        cli_config = cli_file.read()
+    if subnet_index is None:
+        subnet_index = build_subnet_index(dnac_jwt_token)
+    return subnet_index.check_config(cli_config, across_vrfs)
 
 
 def get_device_health(device_name, epoch_time, dnac_jwt_token):
@@ -1103,15 +2304,79 @@ def get_device_health(device_name, epoch_time, dnac_jwt_token):
     :return: detailed network device information
     """
     device_id = get_device_id_name(device_name, dnac_jwt_token)
+    return get_device_detail(device_id, epoch_time, dnac_jwt_token)
+
+
+def get_device_detail(device_id, epoch_time, dnac_jwt_token):
+    """
+    This function will call the device health intent API for the device with the id {device_id}
+    :param device_id: DNA C device id
+    :param epoch_time: epoch time including msec
+    :param dnac_jwt_token: DNA C token
+    :return: detailed network device information
+    """
     url = DNAC_URL + '/dna/intent/api/v1/device-detail?timestamp=' + str(epoch_time) + '&searchBy=' + device_id
     url += '&identifier=uuid'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     device_detail_json = response.json()
     device_detail = device_detail_json['response']
     return device_detail
 
 
+def get_device_health_bulk(device_name_list, epoch_time, dnac_jwt_token, max_workers=DNAC_POOL_SIZE):
+    """
+    This function will call the device health intent API concurrently for all the devices in the
+    {device_name_list}. The device ids are found in the inventory cache, without a DNA C call for each device
+    :param device_name_list: list of device hostnames
+    :param epoch_time: epoch time including msec
+    :param dnac_jwt_token: DNA C token
+    :param max_workers: max number of concurrent DNA C calls
+    :return: dict {device_name: detailed network device information, or {None} if not found or failed}
+    """
+    device_ids = {device_name: get_device_id_name(device_name, dnac_jwt_token) for device_name in device_name_list}
+    device_details = dict.fromkeys(device_ids)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {device_name: executor.submit(get_device_detail, device_id, epoch_time, dnac_jwt_token)
+                   for device_name, device_id in device_ids.items() if device_id is not None}
+        for device_name, future in futures.items():
+            try:
+                device_details[device_name] = future.result()
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                pass  # the device health is {None}
+    return device_details
+
+
+def get_device_health_columns(device_name_list, epoch_time, dnac_jwt_token, max_workers=DNAC_POOL_SIZE):
+    """
+    This function will collect the device health for all the devices in the {device_name_list}, see
+    {get_device_health_bulk}, and will return the numeric fields {DNAC_HEALTH_FIELDS} and the up time, in seconds,
+    as columns: numpy float arrays if NumPy is installed, otherwise array('d'). The missing values are NaN.
+    Example, devices with health below 5, NumPy only: columns['hostname'][columns['overallHealth'] < 5], without
+    NumPy: [name for name, health in zip(columns['hostname'], columns['overallHealth']) if health < 5]
+    :param device_name_list: list of device hostnames
+    :param epoch_time: epoch time including msec
+    :param dnac_jwt_token: DNA C token
+    :param max_workers: max number of concurrent DNA C calls
+    :return: dict {'hostname': hostnames, 'timestamp': epoch time, field: column, ..., 'upTime': column}, all
+    columns in the hostnames order
+    """
+    device_details = get_device_health_bulk(device_name_list, epoch_time, dnac_jwt_token, max_workers)
+    hostnames = list(device_details)
+    columns = {field: array('d') for field in DNAC_HEALTH_FIELDS + ('upTime',)}
+    for device_name in hostnames:
+        device_detail = device_details[device_name] or {}
+        for field in DNAC_HEALTH_FIELDS:
+            columns[field].append(utils.to_float(device_detail.get(field)))
+        columns['upTime'].append(utils.uptime_to_seconds(device_detail.get('upTime')))
+    if numpy is not None:
+        columns = {field: numpy.frombuffer(column, dtype=numpy.float64) for field, column in columns.items()}
+        hostnames = numpy.array(hostnames, dtype=object)
+    columns['hostname'] = hostnames
+    columns['timestamp'] = epoch_time
+    return columns
+
+
 def pnp_get_device_count(device_state, dnac_jwt_token):
     """
     This function will return the count of the PnP devices in the state {state}
@@ -1122,7 +2387,7 @@ def pnp_get_device_count(device_state, dnac_jwt_token):
     url = DNAC_URL + '/dna/intent/api/v1/onboarding/pnp-device/count'
     payload = {'state': device_state}
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, data=json.dumps(payload), verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, data=json.dumps(payload), verify=False)
     pnp_device_count = response.json()
     return pnp_device_count['response']
 
@@ -1135,11 +2400,20 @@ def pnp_get_device_list(dnac_jwt_token):
     """
     url = DNAC_URL + '/dna/intent/api/v1/onboarding/pnp-device'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     pnp_device_json = response.json()
     return pnp_device_json
 
 
+def pnp_iter_device_records(dnac_jwt_token):
+    """
+    The generator will yield a compact record for each PnP device
+    :param dnac_jwt_token: DNA C token
+    :return: records.PnpDeviceRecord, one device at the time
+    """
+    return records.iter_records(records.PnpDeviceRecord, pnp_get_device_list(dnac_jwt_token))
+
+
 def pnp_claim_ap_site(device_id, floor_id, rf_profile, dnac_jwt_token):
     """
     This function will delete claim the AP with the {device_id} to the floor with the {floor_id}
@@ -1157,7 +2431,7 @@ def pnp_claim_ap_site(device_id, floor_id, rf_profile, dnac_jwt_token):
         }
     url = DNAC_URL + '/dna/intent/api/v1/onboarding/pnp-device/site-claim'
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.post(url, headers=header, data=json.dumps(payload), verify=False)
+    response = DNAC_CLIENT.post(url, headers=header, data=json.dumps(payload), verify=False)
     claim_status_json = response.json()
     claim_status = claim_status_json['response']
     return claim_status
@@ -1172,7 +2446,7 @@ def pnp_delete_provisioned_device(device_id, dnac_jwt_token):
     """
     url = DNAC_URL +'/dna/intent/api/v1/onboarding/pnp-device/' + device_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.delete(url, headers=header, verify=False)
+    response = DNAC_CLIENT.delete(url, headers=header, verify=False)
     delete_status = response.json()
     return delete_status
 
@@ -1186,38 +2460,266 @@ def pnp_get_device_info(device_id, dnac_jwt_token):
     """
     url = DNAC_URL + '/api/v1/onboarding/pnp-device/' + device_id
     header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
+    response = DNAC_CLIENT.get(url, headers=header, verify=False)
     device_info_json = response.json()
     device_info = device_info_json['deviceInfo']
     return device_info
 
 
+class PhysicalTopology:
+    """
+    DNA C physical topology graph. The topology is downloaded once and indexed by node id, node label and link port
+    IPv4 address, with an adjacency list for each node, neighbour lookups are answered from the indexes and the path
+    queries are breadth first searches, linear in the topology size.
+    The topology is downloaded again when older than {ttl} seconds, or after calling {invalidate}. Only the changed
+    nodes and links are updated, in copies of the indexes, so the queries are safe while the topology is refreshed
+    from another thread. {version} is incremented when a node is added or removed, or a link is added, removed or
+    moved to other ports, not for the node and link fields updated with each poll
+    """
+
+    def __init__(self, ttl=DNAC_TOPOLOGY_TTL):
+        """
+        :param ttl: cache lifetime in seconds
+        """
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.updated = None
+        self.version = 0
+        self.nodes_by_id = {}
+        self.nodes_by_label = {}
+        self.links_by_key = {}
+        self.ports_by_ipv4 = {}  # port IPv4 address: (link, local node id, connected node id, connected port name)
+        self.adjacency = {}  # node id: {neighbour node id: [link, ...]}
+
+    @staticmethod
+    def get_link_key(link):
+        """
+        :param link: DNA C topology link
+        :return: link key, the link id, or the link end points if the id is missing
+        """
+        return link.get('id') or (link.get('source'), link.get('startPortName'),
+                                  link.get('target'), link.get('endPortName'))
+
+    @staticmethod
+    def get_link_signature(link):
+        """
+        :param link: DNA C topology link
+        :return: the link end points and ports, the link fields updated with each poll are not included
+        """
+        return (link.get('source'), link.get('target'), link.get('startPortName'), link.get('endPortName'),
+                link.get('startPortIpv4Address'), link.get('endPortIpv4Address'))
+
+    def update(self, topology_json):
+        """
+        This function will update the graph with the {topology_json} payload. The indexes are copied, only the nodes
+        and links added, removed or changed since the previous payload are updated in the copies, and the copies
+        replace the indexes at the end. The queries running at the same time keep using the previous indexes
+        :param topology_json: DNA C physical topology, {'nodes': [...], 'links': [...]}
+        :return: True if nodes were added or removed, or links were added, removed or moved, see {version}
+        """
+        nodes = {node['id']: node for node in topology_json.get('nodes', [])}
+        links = {self.get_link_key(link): link for link in topology_json.get('links', [])}
+        removed_links = [link for link_key, link in self.links_by_key.items() if links.get(link_key) != link]
+        added_links = [link for link_key, link in links.items() if self.links_by_key.get(link_key) != link]
+        removed_node_ids = [node_id for node_id in self.nodes_by_id if node_id not in nodes]
+        added_nodes = [node for node_id, node in nodes.items() if self.nodes_by_id.get(node_id) != node]
+        if not (removed_links or added_links or removed_node_ids or added_nodes):
+            return False
+        # nodes added or removed, links added, removed or moved to other ports, see {version}
+        moved = (bool(removed_node_ids) or
+                 any(node['id'] not in self.nodes_by_id for node in added_nodes) or
+                 any(self.get_link_key(link) not in self.links_by_key for link in added_links) or
+                 any(self.get_link_signature(link) != self.get_link_signature(links.get(self.get_link_key(link), {}))
+                     for link in removed_links))
+
+        nodes_by_id = dict(self.nodes_by_id)
+        nodes_by_label = dict(self.nodes_by_label)
+        links_by_key = dict(self.links_by_key)
+        ports_by_ipv4 = dict(self.ports_by_ipv4)
+        adjacency = dict(self.adjacency)
+        copied_node_ids = set()
+
+        def get_neighbour_links(node_id):
+            # the neighbour dict of the node, copied before the first change
+            if node_id not in copied_node_ids:
+                adjacency[node_id] = dict(adjacency.get(node_id, {}))
+                copied_node_ids.add(node_id)
+            return adjacency[node_id]
+
+        for link in removed_links:
+            del links_by_key[self.get_link_key(link)]
+            for node_id, neighbour_id in ((link['source'], link['target']), (link['target'], link['source'])):
+                neighbour_links = get_neighbour_links(node_id)
+                link_list = [neighbour_link for neighbour_link in neighbour_links.get(neighbour_id, [])
+                             if neighbour_link is not link]
+                if link_list:
+                    neighbour_links[neighbour_id] = link_list
+                else:
+                    neighbour_links.pop(neighbour_id, None)
+            for port_ipv4 in (link.get('startPortIpv4Address'), link.get('endPortIpv4Address')):
+                if port_ipv4 and ports_by_ipv4.get(port_ipv4, (None,))[0] is link:
+                    del ports_by_ipv4[port_ipv4]
+        for node_id in removed_node_ids:
+            node = nodes_by_id.pop(node_id)
+            if nodes_by_label.get(node.get('label')) is node:
+                del nodes_by_label[node.get('label')]
+            if not adjacency.get(node_id):
+                adjacency.pop(node_id, None)
+        for node in added_nodes:
+            previous_node = nodes_by_id.get(node['id'])
+            if previous_node is not None and nodes_by_label.get(previous_node.get('label')) is previous_node:
+                del nodes_by_label[previous_node.get('label')]
+            nodes_by_id[node['id']] = node
+            nodes_by_label[node.get('label')] = node
+            adjacency.setdefault(node['id'], {})
+        for link in added_links:
+            source = link['source']
+            target = link['target']
+            links_by_key[self.get_link_key(link)] = link
+            for node_id, neighbour_id in ((source, target), (target, source)):
+                neighbour_links = get_neighbour_links(node_id)
+                neighbour_links[neighbour_id] = neighbour_links.get(neighbour_id, []) + [link]
+            if link.get('startPortIpv4Address'):
+                ports_by_ipv4[link['startPortIpv4Address']] = (link, source, target, link.get('endPortName'))
+            if link.get('endPortIpv4Address'):
+                ports_by_ipv4[link['endPortIpv4Address']] = (link, target, source, link.get('startPortName'))
+
+        self.nodes_by_id = nodes_by_id
+        self.nodes_by_label = nodes_by_label
+        self.links_by_key = links_by_key
+        self.ports_by_ipv4 = ports_by_ipv4
+        self.adjacency = adjacency
+        if moved:
+            self.version += 1
+        return moved
+
+    def refresh(self, dnac_jwt_token):
+        """
+        This function will download the physical topology and update the graph
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        url = DNAC_URL + '/api/v1/topology/physical-topology'
+        header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
+        response = DNAC_CLIENT.get(url, headers=header, verify=False)
+        self.update(response.json()['response'])
+        self.updated = time.monotonic()
+
+    def invalidate(self):
+        """
+        This function will force a new topology download at the next query
+        :return:
+        """
+        self.updated = None
+
+    def check_refresh(self, dnac_jwt_token):
+        """
+        This function will refresh the topology if never downloaded, invalidated or older than {ttl}.
+        Only one of the concurrent callers will download the topology
+        :param dnac_jwt_token: DNA C token
+        :return:
+        """
+        if self.updated is None or time.monotonic() - self.updated > self.ttl:
+            with self.lock:
+                if self.updated is None or time.monotonic() - self.updated > self.ttl:
+                    self.refresh(dnac_jwt_token)
+
+    def get_connected_port(self, ip_address, dnac_jwt_token):
+        """
+        :param ip_address: device/interface IP address
+        :param dnac_jwt_token: DNA C token
+        :return: connected node, connected port name, or {None, None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        nodes_by_id = self.nodes_by_id
+        port = self.ports_by_ipv4.get(ip_address)
+        if port is None:
+            return None, None
+        return nodes_by_id.get(port[2]), port[3]
+
+    def get_node_by_label(self, label, dnac_jwt_token):
+        """
+        :param label: node label, the device hostname
+        :param dnac_jwt_token: DNA C token
+        :return: node, or {None} if not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return self.nodes_by_label.get(label)
+
+    def get_neighbours(self, node_id, dnac_jwt_token):
+        """
+        :param node_id: node id
+        :param dnac_jwt_token: DNA C token
+        :return: {neighbour node id: [link, ...]}, empty if the node is not found
+        """
+        self.check_refresh(dnac_jwt_token)
+        return dict(self.adjacency.get(node_id, {}))
+
+    def get_shortest_path(self, source_id, target_id, dnac_jwt_token):
+        """
+        This function will find the path with the minimum number of hops from the node {source_id} to {target_id}
+        :param source_id: source node id
+        :param target_id: target node id
+        :param dnac_jwt_token: DNA C token
+        :return: list of node ids, [source_id, ..., target_id], or {None} if not connected
+        """
+        self.check_refresh(dnac_jwt_token)
+        adjacency = self.adjacency  # the same indexes for the entire search, even if refreshed meanwhile
+        if source_id not in adjacency or target_id not in adjacency:
+            return None
+        previous = {source_id: None}
+        queue = collections.deque([source_id])
+        while queue:
+            node_id = queue.popleft()
+            if node_id == target_id:
+                path = []
+                while node_id is not None:
+                    path.append(node_id)
+                    node_id = previous[node_id]
+                return path[::-1]
+            for neighbour_id in adjacency[node_id]:
+                if neighbour_id not in previous:
+                    previous[neighbour_id] = node_id
+                    queue.append(neighbour_id)
+        return None
+
+    def get_blast_radius(self, node_id, dnac_jwt_token, root_ids=None):
+        """
+        This function will find the nodes that will lose the connectivity to all the root nodes if the node
+        {node_id} fails
+        :param node_id: failed node id
+        :param dnac_jwt_token: DNA C token
+        :param root_ids: root node ids, default the nodes with the roles {DNAC_TOPOLOGY_ROOT_ROLES}
+        :return: set of node ids, not including the failed node
+        """
+        self.check_refresh(dnac_jwt_token)
+        nodes_by_id = self.nodes_by_id  # the same indexes for the entire search, even if refreshed meanwhile
+        adjacency = self.adjacency
+        if root_ids is None:
+            root_ids = [root_id for root_id, node in nodes_by_id.items()
+                        if node.get('role') in DNAC_TOPOLOGY_ROOT_ROLES]
+        reachable = {root_id for root_id in root_ids if root_id != node_id and root_id in adjacency}
+        queue = collections.deque(reachable)
+        while queue:
+            for neighbour_id in adjacency[queue.popleft()]:
+                if neighbour_id != node_id and neighbour_id not in reachable:
+                    reachable.add(neighbour_id)
+                    queue.append(neighbour_id)
+        return {other_id for other_id in adjacency if other_id != node_id and other_id not in reachable}
+
+
+PHYSICAL_TOPOLOGY = PhysicalTopology()
+
+
 def get_physical_topology(ip_address, dnac_jwt_token):
     """
     This function will retrieve the physical topology for the device/client with the {ip_address}
     :param ip_address: device/interface IP address
     :param dnac_jwt_token: Cisco DNA C token
-    :return: topology info - connected device hostname and interface
+    :return: topology info - connected device hostname and interface, or {None, None} if not found
     """
-    url = DNAC_URL + '/api/v1/topology/physical-topology'
-    header = {'content-type': 'application/json', 'x-auth-token': dnac_jwt_token}
-    response = requests.get(url, headers=header, verify=False)
-    topology_json = response.json()['response']
-    topology_nodes = topology_json['nodes']
-    topology_links = topology_json['links']
-
-    # try to identify the physical topology
-    for link in topology_links:
-        try:
-            if link['startPortIpv4Address'] == ip_address:
-                connected_port = link['endPortName']
-                connected_device_id = link['target']
-                for node in topology_nodes:
-                    if node['id'] == connected_device_id:
-                        connected_device_hostname = node['label']
-                break
-        except:
-            connected_port = None
-            connected_device_hostname = None
-    return connected_device_hostname, connected_port
+    connected_node, connected_port = PHYSICAL_TOPOLOGY.get_connected_port(ip_address, dnac_jwt_token)
+    if connected_node is None:
+        return None, connected_port
+    return connected_node.get('label'), connected_port
 
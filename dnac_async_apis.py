@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+
+# developed by Gabi Zapodeanu, TME, Enterprise Networks, Cisco Systems
+
+
+# this module includes the asyncio versions of the dnac_apis functions, same params and same return values.
+# The DNA C calls are sent by the dnac_apis pooled client from a thread pool, at most {DNAC_CONCURRENCY} at the time.
+# Example, health for all the devices in a building:
+#   health_list = asyncio.run(gather(get_device_health, [(name, epoch_time, dnac_token) for name in device_names]))
+
+
+import asyncio
+import functools
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+
+import dnac_apis
+
+
+DNAC_CONCURRENCY = dnac_apis.DNAC_POOL_SIZE  # max number of concurrent DNA C calls, match the client pool size
+
+_executor = ThreadPoolExecutor(max_workers=DNAC_CONCURRENCY)
+_semaphores = weakref.WeakKeyDictionary()  # one semaphore for each event loop
+
+
+def set_concurrency(concurrency):
+    """
+    This function will change the max number of concurrent DNA C calls. Replace the dnac_apis.DNAC_CLIENT with a
+    client with a pool size at least equal with {concurrency}, to avoid opening new connections for each call
+    :param concurrency: max number of concurrent DNA C calls
+    :return:
+    """
+    global DNAC_CONCURRENCY, _executor
+    DNAC_CONCURRENCY = concurrency
+    _executor = ThreadPoolExecutor(max_workers=concurrency)
+    _semaphores.clear()
+
+
+def _get_semaphore():
+    """
+    This function will return the concurrency semaphore for the running event loop
+    :return: asyncio semaphore
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(DNAC_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+
+async def run_dnac(function, *args):
+    """
+    This function will run the blocking dnac_apis {function} in the thread pool, without blocking the event loop
+    :param function: dnac_apis function
+    :param args: the function arguments
+    :return: the function return value
+    """
+    async with _get_semaphore():
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_executor, functools.partial(function, *args))
+
+
+async def gather(function, args_list, return_exceptions=False):
+    """
+    This function will run the async {function} concurrently for each of the arguments in the {args_list}
+    :param function: async function from this module
+    :param args_list: list of arguments tuples, one for each call
+    :param return_exceptions: if True, exceptions are returned in the results list, not raised
+    :return: list with the results, in the {args_list} order
+    """
+    return await asyncio.gather(*[function(*args) for args in args_list], return_exceptions=return_exceptions)
+
+
+async def get_dnac_jwt_token():
+    """
+    This function will return the DNA C token cached by the dnac_apis token manager
+    :return: DNA C JWT token
+    """
+    return await dnac_apis.DNAC_TOKEN.get_token_async()
+
+
+async def get_all_device_info(dnac_jwt_token):
+    """
+    Async dnac_apis.get_all_device_info
+    :param dnac_jwt_token: DNA C token
+    :return: DNA C device inventory info
+    """
+    return await run_dnac(dnac_apis.get_all_device_info, dnac_jwt_token)
+
+
+async def get_device_info(device_id, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_info
+    :param device_id: DNA C device_id
+    :param dnac_jwt_token: DNA C token
+    :return: device info
+    """
+    return await run_dnac(dnac_apis.get_device_info, device_id, dnac_jwt_token)
+
+
+async def get_device_info_ip(ip_address, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_info_ip
+    :param ip_address: device management ip address
+    :param dnac_jwt_token: DNA C token
+    :return: device information, or None
+    """
+    return await run_dnac(dnac_apis.get_device_info_ip, ip_address, dnac_jwt_token)
+
+
+async def get_device_id_name(device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_id_name
+    :param device_name: device hostname
+    :param dnac_jwt_token: DNA C token
+    :return: DNA C device id
+    """
+    return await run_dnac(dnac_apis.get_device_id_name, device_name, dnac_jwt_token)
+
+
+async def get_device_management_ip(device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_management_ip
+    :param device_name: device name
+    :param dnac_jwt_token: DNA C token
+    :return: the management ip address
+    """
+    return await run_dnac(dnac_apis.get_device_management_ip, device_name, dnac_jwt_token)
+
+
+async def get_device_status(device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_status
+    :param device_name: device name
+    :param dnac_jwt_token: DNA C token
+    :return: status - {UNKNOWN}, {SUCCESS} or {FAILURE}
+    """
+    return await run_dnac(dnac_apis.get_device_status, device_name, dnac_jwt_token)
+
+
+async def get_device_location(device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_location
+    :param device_name: device name
+    :param dnac_jwt_token: DNA C token
+    :return: the location
+    """
+    return await run_dnac(dnac_apis.get_device_location, device_name, dnac_jwt_token)
+
+
+async def get_device_config(device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_config
+    :param device_name: device hostname
+    :param dnac_jwt_token: DNA C token
+    :return: configuration file
+    """
+    return await run_dnac(dnac_apis.get_device_config, device_name, dnac_jwt_token)
+
+
+async def get_device_health(device_name, epoch_time, dnac_jwt_token):
+    """
+    Async dnac_apis.get_device_health
+    :param device_name: device hostname
+    :param epoch_time: epoch time including msec
+    :param dnac_jwt_token: DNA C token
+    :return: detailed network device information
+    """
+    return await run_dnac(dnac_apis.get_device_health, device_name, epoch_time, dnac_jwt_token)
+
+
+async def get_client_info(client_ip, dnac_jwt_token):
+    """
+    Async dnac_apis.get_client_info
+    :param client_ip: client IPv4 address
+    :param dnac_jwt_token: DNA C token
+    :return: client info, or {None} if client does not found
+    """
+    return await run_dnac(dnac_apis.get_client_info, client_ip, dnac_jwt_token)
+
+
+async def locate_client_ip(client_ip, dnac_jwt_token):
+    """
+    Async dnac_apis.locate_client_ip
+    :param client_ip: Client IP Address
+    :param dnac_jwt_token: DNA C token
+    :return: hostname, interface_name, vlan_id, or None, if the client does not exist
+    """
+    return await run_dnac(dnac_apis.locate_client_ip, client_ip, dnac_jwt_token)
+
+
+async def check_ipv4_network_interface(ip_address, dnac_jwt_token):
+    """
+    Async dnac_apis.check_ipv4_network_interface
+    :param ip_address: IPv4 address
+    :param dnac_jwt_token: DNA C token
+    :return: None, or device_hostname and interface_name
+    """
+    return await run_dnac(dnac_apis.check_ipv4_network_interface, ip_address, dnac_jwt_token)
+
+
+async def check_ipv4_address(ipv4_address, dnac_jwt_token):
+    """
+    Async dnac_apis.check_ipv4_address
+    :param ipv4_address: IPv4 address
+    :param dnac_jwt_token: DNA C token
+    :return: True/False
+    """
+    return await run_dnac(dnac_apis.check_ipv4_address, ipv4_address, dnac_jwt_token)
+
+
+async def get_output_command_runner(command, device_name, dnac_jwt_token):
+    """
+    Async dnac_apis.get_output_command_runner
+    :param command: CLI command
+    :param device_name: device hostname
+    :param dnac_jwt_token: DNA C token
+    :return: the command output
+    """
+    return await run_dnac(dnac_apis.get_output_command_runner, command, device_name, dnac_jwt_token)
+
+
+async def check_task_id_status(task_id, dnac_jwt_token):
+    """
+    Async dnac_apis.check_task_id_status
+    :param task_id: task id
+    :param dnac_jwt_token: DNA C token
+    :return: status - {SUCCESS} or {FAILURE}
+    """
+    return await run_dnac(dnac_apis.check_task_id_status, task_id, dnac_jwt_token)
+
+
+async def check_template_deployment_status(depl_task_id, dnac_jwt_token):
+    """
+    Async dnac_apis.check_template_deployment_status
+    :param depl_task_id: template deployment id
+    :param dnac_jwt_token: DNA C token
+    :return: status - {SUCCESS} or {FAILURE}
+    """
+    return await run_dnac(dnac_apis.check_template_deployment_status, depl_task_id, dnac_jwt_token)
+
+
+async def create_path_trace(src_ip, dest_ip, dnac_jwt_token):
+    """
+    Async dnac_apis.create_path_trace
+    :param src_ip: Source IP address
+    :param dest_ip: Destination IP address
+    :param dnac_jwt_token: DNA C token
+    :return: DNA C path visualisation id
+    """
+    return await run_dnac(dnac_apis.create_path_trace, src_ip, dest_ip, dnac_jwt_token)
+
+
+async def get_path_trace_info(path_id, dnac_jwt_token):
+    """
+    Async dnac_apis.get_path_trace_info
+    :param path_id: DNA C path visualisation id
+    :param dnac_jwt_token: DNA C token
+    :return: Path visualisation status, and the details in a list [device,interface_out,interface_in,device...]
+    """
+    return await run_dnac(dnac_apis.get_path_trace_info, path_id, dnac_jwt_token)
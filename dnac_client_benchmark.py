@@ -0,0 +1,82 @@
+# developed by Gabi Zapodeanu, TME, Enterprise Networks, Cisco Systems
+
+
+# !/usr/bin/env python3
+
+
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+import dnac_apis  # import the DNA C module
+
+
+STUB_HOST = '127.0.0.1'
+STUB_PORT = 18080
+REQUEST_COUNT = 1000
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Local DNA C stub, answers every GET with an empty device list, HTTP/1.1 keep-alive enabled
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # no delayed ACK stalls on the keep-alive connections
+
+    def do_GET(self):
+        body = json.dumps({'response': []}).encode()
+        self.send_response(200)
+        self.send_header('content-type', 'application/json')
+        self.send_header('content-length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def requests_per_second(get_function, url, count):
+    """
+    This function will send {count} GET requests to the {url} using the {get_function}
+    :param get_function: function used to send the GET request
+    :param url: URL
+    :param count: number of requests
+    :return: requests per second
+    """
+    start_time = time.perf_counter()
+    for index in range(count):
+        get_function(url, headers={'content-type': 'application/json'}, verify=False).json()
+    return count / (time.perf_counter() - start_time)
+
+
+def main():
+    """
+    The script will start a local DNA C stub server and compare the requests per second for the module level
+    requests.get (new TCP connection for each call) with the pooled, keep-alive dnac_apis.DNAC_CLIENT.
+    With a real DNA C, over https, the difference is larger, each new connection includes also the TLS handshake.
+    """
+
+    server = ThreadingHTTPServer((STUB_HOST, STUB_PORT), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = 'http://' + STUB_HOST + ':' + str(STUB_PORT) + '/api/v1/network-device'
+
+    print('\nSending ', REQUEST_COUNT, ' requests to ', url)
+
+    per_call_rate = requests_per_second(requests.get, url, REQUEST_COUNT)
+    print('\nrequests.get, new connection for each call: ', round(per_call_rate, 1), ' requests/sec')
+
+    pooled_rate = requests_per_second(dnac_apis.DNAC_CLIENT.get, url, REQUEST_COUNT)
+    print('DnacClient, pooled keep-alive session:      ', round(pooled_rate, 1), ' requests/sec')
+
+    print('\nSpeedup: ', round(pooled_rate / per_call_rate, 2), 'x')
+
+    server.shutdown()
+    print('\n\nEnd of Application Run\n')
+
+
+if __name__ == '__main__':
+    main()
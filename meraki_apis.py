@@ -9,6 +9,9 @@
 
 
 import json
+import os
+import threading
+import time
 
 import requests
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
@@ -18,21 +21,171 @@ from modules_init import MERAKI_API_KEY, MERAKI_URL
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)  # Disable insecure https warnings
 
 
+MERAKI_RESOLVER_TTL = 3600  # seconds, organization and network ids cache lifetime
+MERAKI_CACHE_FILE = None  # optional JSON file name, to keep the organization and network ids between runs
+
+
+class MerakiResolver:
+    """
+    Meraki organization and network name to id cache. The organizations and the networks for each organization are
+    downloaded once, and again when older than {ttl} seconds, after calling {invalidate}, or when a name is not found.
+    If {cache_file} is provided, the ids are also saved to this JSON file, and loaded from it at start
+    """
+
+    def __init__(self, ttl=MERAKI_RESOLVER_TTL, cache_file=MERAKI_CACHE_FILE):
+        """
+        :param ttl: cache lifetime in seconds
+        :param cache_file: optional JSON file name
+        """
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.organizations = None  # {'updated': epoch time, 'ids': {org name: org id}}
+        self.networks = {}  # org id: {'updated': epoch time, 'ids': {network name: network id}}
+        self.load()
+
+    def load(self):
+        """
+        This function will load the ids from the {cache_file}, if the file exists
+        :return:
+        """
+        if self.cache_file is None or not os.path.isfile(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as cache_file:
+                cache_json = json.load(cache_file)
+            self.organizations = cache_json['organizations']
+            self.networks = cache_json['networks']
+        except (ValueError, KeyError, OSError):
+            self.organizations = None
+            self.networks = {}
+
+    def save(self):
+        """
+        This function will save the ids to the {cache_file}, if provided
+        :return:
+        """
+        if self.cache_file is None:
+            return
+        temp_file_name = self.cache_file + '.tmp'
+        with open(temp_file_name, 'w') as cache_file:
+            json.dump({'organizations': self.organizations, 'networks': self.networks}, cache_file)
+        os.replace(temp_file_name, self.cache_file)
+
+    def is_valid(self, entry):
+        """
+        :param entry: {'updated': epoch time, 'ids': {...}}, or {None}
+        :return: True if the entry exists and it is not older than {ttl}
+        """
+        return entry is not None and time.time() - entry['updated'] <= self.ttl
+
+    def load_organizations(self):
+        """
+        This function will get the Meraki Organization Id for the user with the MERAKI_API_KEY
+        API call to /organizations
+        :return: Meraki Organization Ids as a an array of {'name':'id',...}
+        """
+        url = MERAKI_URL + '/organizations'
+        header = {'content-type': 'application/json', 'X-Cisco-Meraki-API-Key': MERAKI_API_KEY}
+        org_response = requests.get(url, headers=header, verify=False)
+        org_json = org_response.json()
+        org_dict = {}
+        for org in org_json:
+            org_dict.update({org['name']: org['id']})
+        return org_dict
+
+    def load_networks(self, org_id):
+        """
+        This function will return the list of networks associated with the Meraki Organization ID
+        API call to /organizations/{organization_id]/networks
+        :param org_id: Meraki organization id
+        :return: Meraki Network Ids as an array of {'name':'id',...}
+        """
+        url = MERAKI_URL + '/organizations/' + str(org_id) + '/networks'
+        header = {'content-type': 'application/json', 'X-Cisco-Meraki-API-Key': MERAKI_API_KEY}
+        networks_response = requests.get(url, headers=header, verify=False)
+        networks_json = networks_response.json()
+        networks_dict = {}
+        for netw in networks_json:
+            network_id = netw['id']
+            network_name = netw['name']
+            networks_dict.update({network_name: network_id})
+        return networks_dict
+
+    def get_organizations(self, refresh=False):
+        """
+        :param refresh: if True, download the organizations even if cached
+        :return: Meraki Organization Ids as a an array of {'name':'id',...}
+        """
+        with self.lock:
+            if refresh or not self.is_valid(self.organizations):
+                self.organizations = {'updated': time.time(), 'ids': self.load_organizations()}
+                self.save()
+            return dict(self.organizations['ids'])
+
+    def get_networks(self, org_id, refresh=False):
+        """
+        :param org_id: Meraki organization id
+        :param refresh: if True, download the networks even if cached
+        :return: Meraki Network Ids as an array of {'name':'id',...}
+        """
+        org_key = str(org_id)  # JSON object keys are strings
+        with self.lock:
+            if refresh or not self.is_valid(self.networks.get(org_key)):
+                self.networks[org_key] = {'updated': time.time(), 'ids': self.load_networks(org_id)}
+                self.save()
+            return dict(self.networks[org_key]['ids'])
+
+    def get_organization_id(self, org_name):
+        """
+        :param org_name: Meraki organization name
+        :return: Meraki organization id, the organizations are downloaded again if the name is not cached
+        """
+        org_dict = self.get_organizations()
+        if org_name not in org_dict:
+            org_dict = self.get_organizations(refresh=True)
+        return org_dict[org_name]
+
+    def get_network_id(self, org_name, netw_name):
+        """
+        :param org_name: Meraki organization name
+        :param netw_name: Meraki network name
+        :return: Meraki network id, the networks are downloaded again if the name is not cached
+        """
+        org_id = self.get_organization_id(org_name)
+        netw_dict = self.get_networks(org_id)
+        if netw_name not in netw_dict:
+            netw_dict = self.get_networks(org_id, refresh=True)
+        return netw_dict[netw_name]
+
+    def invalidate(self, org_name=None):
+        """
+        This function will remove the networks for the organization {org_name} from the cache, or all the
+        organizations and networks if {None}
+        :param org_name: Meraki organization name
+        :return:
+        """
+        with self.lock:
+            if org_name is None:
+                self.organizations = None
+                self.networks = {}
+            elif self.organizations is not None and org_name in self.organizations['ids']:
+                self.networks.pop(str(self.organizations['ids'][org_name]), None)
+            self.save()
+
+
+MERAKI_RESOLVER = MerakiResolver()
+
+
 def get_organizations():
     """
-    This function will get the Meraki Organization Id for the user with the MERAKI_API_KEY
+    This function will get the Meraki Organization Id for the user with the MERAKI_API_KEY, from the resolver cache
+    if available
     API call to /organizations
     :return: Meraki Organization Ids as a an array of {'name':'id',...}
     """
 
-    url = MERAKI_URL + '/organizations'
-    header = {'content-type': 'application/json', 'X-Cisco-Meraki-API-Key': MERAKI_API_KEY}
-    org_response = requests.get(url, headers=header, verify=False)
-    org_json = org_response.json()
-    org_dict = {}
-    for org in org_json:
-        org_dict.update({org['name']: org['id']})
-    return org_dict
+    return MERAKI_RESOLVER.get_organizations()
 
 
 def get_organization_id(org_name):
@@ -42,29 +195,21 @@ def get_organization_id(org_name):
     :return: Meraki organization id
     """
 
-    org_dict = get_organizations()
-    org_id = org_dict[org_name]
+    org_id = MERAKI_RESOLVER.get_organization_id(org_name)
     return org_id
 
 
 def get_networks(org_name):
     """
-    This function will return the list of networks associated with the Meraki Organization ID
+    This function will return the list of networks associated with the Meraki Organization ID, from the resolver
+    cache if available
     API call to /organizations/{organization_id]/networks
     :param org_name: Meraki organization name
     :return: Meraki Network Ids as an array of {'name':'id',...}
     """
 
     org_id = get_organization_id(org_name)
-    url = MERAKI_URL + '/organizations/' + str(org_id) + '/networks'
-    header = {'content-type': 'application/json', 'X-Cisco-Meraki-API-Key': MERAKI_API_KEY}
-    networks_response = requests.get(url, headers=header, verify=False)
-    networks_json = networks_response.json()
-    networks_dict = {}
-    for netw in networks_json:
-        network_id = netw['id']
-        network_name = netw['name']
-        networks_dict.update({network_name: network_id})
+    networks_dict = MERAKI_RESOLVER.get_networks(org_id)
     return networks_dict
 
 
@@ -76,8 +221,7 @@ def get_network_id(org_name, netw_name):
     :return: Meraki network id
     """
 
-    netw_dict = get_networks(org_name)
-    netw_id = netw_dict[netw_name]
+    netw_id = MERAKI_RESOLVER.get_network_id(org_name, netw_name)
     return netw_id
 
 
@@ -6,8 +6,6 @@
 # !/usr/bin/env python3
 
 
-import time
-
 import requests.packages.urllib3
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
@@ -50,14 +48,10 @@ def main():
     path_trace_id = apic_em_apis.create_path_trace(src_ip, dest_ip, apic_em_ticket)
     print('\nAPIC-EM Path Trace id created: ', path_trace_id)
 
-    # wait 10 seconds for the path trace to complete
-
-    print('\nWait 10 seconds for the Path Trace to complete')
-    time.sleep(10)
-
-    # retrieve the path trace details
+    # wait for the path trace to complete, and retrieve the path trace details
 
-    path_trace = apic_em_apis.get_path_trace_info(path_trace_id, apic_em_ticket)
+    print('\nWait for the Path Trace to complete')
+    path_trace = utils.wait_for_path_trace(path_trace_id, apic_em_apis.get_path_trace_info, apic_em_ticket)
     print('\nPath Trace details: \n')
     utils.pprint(path_trace)
 
@@ -7,10 +7,15 @@
 
 import requests
 import json
+import time
+import threading
+import email.utils
+import urllib.parse
 import utils
 
 from modules_init import PI_URL, PI_USER, PI_PASSW
 from requests.auth import HTTPBasicAuth  # for Basic Auth
+from concurrent.futures import ThreadPoolExecutor  # for the concurrent entity calls
 
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
@@ -19,89 +24,420 @@ requests.packages.urllib3.disable_warnings(InsecureRequestWarning)  # Disable in
 
 PI_AUTH = HTTPBasicAuth(PI_USER, PI_PASSW)
 
+PI_PAGE_SIZE = 1000  # max number of entities returned by PI for one call
+PI_MAX_WORKERS = 5  # max number of concurrent PI calls
+PI_RATE = 5  # requests/sec, initial PI request rate
+PI_MIN_RATE = 0.5  # requests/sec, min PI request rate after throttling
+PI_MAX_RATE = 50  # requests/sec, max PI request rate
+PI_BURST = 5  # max number of PI requests sent back to back
+PI_MAX_RETRIES = 5  # max number of retries for the throttled PI requests
+PI_THROTTLE_STATUS = (429, 503)  # HTTP status codes returned by PI when over the rate limit
+PI_FILTER_MAX_VALUES = 100  # max number of values in one in(...) query filter
+PI_DEPLOY_MAX_TARGETS = 100  # max number of target devices in one template deployment job
+PI_JOB_TIMEOUT = 600  # seconds, max wait time for the template deployment jobs
+PI_JOB_DONE_STATUS = ('SUCCESS', 'FAILURE', 'PARTIAL_SUCCESS')  # PI job final result status
+PI_RESOLVER_TTL = 3600  # seconds, device and CLI template ids cache lifetime
+PI_RESOLVER_NEGATIVE_TTL = 60  # seconds, cache lifetime for the device and CLI template names not found
+
+
+class PiScheduler:
+    """
+    Token bucket scheduler for the PI requests, shared by all the pi_apis calls, from all threads.
+    The rate increases with 1 request/sec for each second of successful requests, up to {max_rate}, and is halved
+    for each HTTP 429 or 503 response, down to {min_rate}. The throttled requests are retried after the Retry-After
+    header time, or after an exponential backoff, and no other request is sent during this time
+    """
 
-def pi_get_events():
+    def __init__(self, rate=PI_RATE, min_rate=PI_MIN_RATE, max_rate=PI_MAX_RATE, burst=PI_BURST,
+                 max_retries=PI_MAX_RETRIES):
+        """
+        :param rate: initial rate, requests/sec
+        :param min_rate: min rate, requests/sec
+        :param max_rate: max rate, requests/sec
+        :param burst: token bucket size, max number of requests sent back to back
+        :param max_retries: max number of retries for each throttled request
+        """
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0
+
+    def acquire(self):
+        """
+        This function will wait until a request may be sent, and will take one token from the bucket
+        :return:
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait_time = self.blocked_until - now
+                if wait_time <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+    def success(self):
+        """
+        This function will increase the rate after a successful request, additive increase
+        :return:
+        """
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def throttle(self, retry_after):
+        """
+        This function will decrease the rate after a throttled request, multiplicative decrease, and will stop all
+        the requests for {retry_after} seconds
+        :param retry_after: seconds to wait before the next request
+        :return:
+        """
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    @staticmethod
+    def get_retry_after(response):
+        """
+        :param response: HTTP response
+        :return: the Retry-After header time, in seconds, or {None} if missing or in an unknown format
+        """
+        retry_after = response.headers.get('Retry-After')
+        if retry_after is None:
+            return None
+        if retry_after.strip().isdigit():
+            return int(retry_after)
+        try:
+            return max(0, email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def request(self, method, url, **kwargs):
+        """
+        This function will send the request when allowed by the token bucket, and will retry the throttled requests
+        :param method: HTTP method
+        :param url: URL
+        :param kwargs: requests.request parameters
+        :return: the HTTP response, the last throttled response if not successful after {max_retries} retries
+        """
+        backoff = utils.backoff_intervals(1, 30)
+        for attempt in range(self.max_retries + 1):
+            self.acquire()
+            response = requests.request(method, url, **kwargs)
+            if response.status_code not in PI_THROTTLE_STATUS:
+                self.success()
+                return response
+            retry_after = self.get_retry_after(response)
+            self.throttle(retry_after if retry_after is not None else next(backoff))
+        return response
+
+
+PI_SCHEDULER = PiScheduler()
+
+
+def pi_request(method, url, **kwargs):
+    """
+    This function will send the PI request using the shared scheduler, see {PiScheduler}
+    :param method: HTTP method
+    :param url: URL
+    :param kwargs: requests.request parameters
+    :return: the HTTP response
+    """
+    return PI_SCHEDULER.request(method, url, **kwargs)
 
+
+def pi_get_entity_page(resource, first_result, max_results, full=True, api_version='v1'):
     """
-    This a sample PI API.
+    This function will return one page of the PI {resource} entities, {max_results} entities starting with the index
+    {first_result}
+    Call to Prime Infrastructure - /webacs/api/{api_version}/data/{resource}?.firstResult=&.maxResults=
+    :param resource: PI data resource, example 'ClientSessions'
+    :param first_result: index of the first entity, starting with 0
+    :param max_results: number of entities to return
+    :param full: if True, return the full entities, .full=true, if False, only the entity ids
+    :param api_version: PI API version
+    :return: the entities count, and the list of the entities, or the list of entity ids
     """
-    events_list_number=[]
-    url = PI_URL + '/webacs/api/v1/data/Events'
+    url = PI_URL + '/webacs/api/' + api_version + '/data/' + resource + '?.firstResult=' + str(first_result)
+    url += '&.maxResults=' + str(max_results)
+    if full:
+        url += '&.full=true'
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    events = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    events_json = events.json()
-    events_list = events_json['queryResponse']['entityId']
-    for event in events_list:
-        events_list_number.append(event['$'])
-
-    for event in events_list_number:
-        url = PI_URL + '/webacs/api/v1/data/Events/' + event
-        header = {'content-type': 'application/json', 'accept': 'application/json'}
-        event = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-        event_json = event.json()
-        utils.pprint(event_json)
+    response = pi_request('GET', url, headers=header, verify=False, auth=PI_AUTH)
+    query_response = response.json()['queryResponse']
+    entity_count = int(query_response.get('@count', 0))
+    if full:
+        return entity_count, [pi_get_entity_dto(entity) for entity in query_response.get('entity', [])]
+    return entity_count, [entity_id['$'] for entity_id in query_response.get('entityId', [])]
 
 
-def pi_get_client_details():
+def pi_get_entity_dto(entity):
+    """
+    This function will return the entity data from the PI entity, example the {clientSessionsDTO} for a client session
+    :param entity: PI entity, {'@dtoType': dto_type, dto_type: {...}}
+    :return: the entity data
+    """
+    return entity.get(entity.get('@dtoType'), entity)
+
 
+def pi_get_entity(resource, entity_id, api_version='v1'):
     """
-    This a sample PI API.
+    This function will return the PI {resource} entity with the id {entity_id}
+    Call to Prime Infrastructure - /webacs/api/{api_version}/data/{resource}/{entity_id}
+    :param resource: PI data resource, example 'ClientSessions'
+    :param entity_id: PI entity id
+    :param api_version: PI API version
+    :return: the entity data
     """
-    clients_list_number = []
-    url = PI_URL + '/webacs/api/v2/data/ClientDetails'
+    url = PI_URL + '/webacs/api/' + api_version + '/data/' + resource + '/' + entity_id
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    clients = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    clients_json = clients.json()
-    clients_list = clients_json['queryResponse']['entityId']
+    response = pi_request('GET', url, headers=header, verify=False, auth=PI_AUTH)
+    entity_json = response.json()
+    return pi_get_entity_dto(entity_json['queryResponse']['entity'][0])
 
-    for client in clients_list:
-        clients_list_number.append(client['$'])
 
-    for client in clients_list_number:
-        url = PI_URL + '/webacs/api/v2/data/ClientDetails/' + client
-        header = {'content-type': 'application/json', 'accept': 'application/json'}
-        client = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-        client_json = client.json()
-        utils.pprint(client_json)
+def pi_iter_entities(resource, api_version='v1', full=True, page_size=PI_PAGE_SIZE, max_workers=PI_MAX_WORKERS):
+    """
+    This generator will walk all the PI {resource} entities one page at the time, and will yield the data for each
+    entity. With {full} True, each page includes the full entities, one call for {page_size} entities.
+    With {full} False, for PI versions without .full support, each page includes the entity ids, and the entities are
+    retrieved with one call for each id, {max_workers} calls at the time
+    :param resource: PI data resource, example 'ClientSessions'
+    :param api_version: PI API version
+    :param full: if True, use the .full=true list mode, if False, one call for each entity id
+    :param page_size: number of entities, or entity ids, requested with each call
+    :param max_workers: max number of concurrent calls, for the entity id calls
+    :return: entity data, one entity at the time
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers) if not full else None
+    try:
+        first_result = 0
+        while True:
+            entity_count, page = pi_get_entity_page(resource, first_result, page_size, full, api_version)
+            if executor is not None:
+                page = executor.map(pi_get_entity, [resource] * len(page), page, [api_version] * len(page))
+            page_length = 0
+            for entity in page:
+                page_length += 1
+                yield entity
+            first_result += page_length
+            if page_length == 0 or first_result >= entity_count:  # PI may return less than {page_size} entities
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pi_get_events(full=True):
+    """
+    This generator will yield all the PI events, see {pi_iter_entities}
+    :param full: if True, use the .full=true list mode, if False, one call for each event id
+    :return: event data, one event at the time
+    """
+    return pi_iter_entities('Events', 'v1', full)
+
 
+def pi_get_client_details(full=True):
+    """
+    This generator will yield the details for all the PI clients, see {pi_iter_entities}
+    :param full: if True, use the .full=true list mode, if False, one call for each client id
+    :return: client details, one client at the time
+    """
+    return pi_iter_entities('ClientDetails', 'v2', full)
 
-def pi_get_client_sessions():
 
+def pi_get_client_sessions(full=True):
     """
-    This a sample PI API.
+    This generator will yield all the PI client sessions, see {pi_iter_entities}
+    :param full: if True, use the .full=true list mode, if False, one call for each session id
+    :return: client session data, one session at the time
     """
-    sessions_list_number = []
-    url = PI_URL + '/webacs/api/v1/data/ClientSessions'
-    header = {'content-type': 'application/json', 'accept': 'application/json'}
-    sessions = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    sessions_json = sessions.json()
-    sessions_list = sessions_json['queryResponse']['entityId']
+    return pi_iter_entities('ClientSessions', 'v1', full)
 
-    for session in sessions_list:
-        sessions_list_number.append(session['$'])
 
-    for session in sessions_list_number:
-        url = PI_URL + '/webacs/api/v1/data/ClientSessions/' + session
+def pi_filter_in(value_list):
+    """
+    This function will create the PI query filter value matching any of the values in the {value_list}
+    :param value_list: list of values
+    :return: filter value, example in("SW1","SW2")
+    """
+    return 'in(' + ','.join('"' + urllib.parse.quote(str(value), safe='') + '"' for value in value_list) + ')'
+
+
+class PiResolver:
+    """
+    PI device name and CLI template name to id cache. The ids are cached for {ttl} seconds, the names not found for
+    {negative_ttl} seconds. The device ids are resolved with one call for each {PI_FILTER_MAX_VALUES} devices, and
+    all the ids may be loaded in advance with {warm_up}, from the paged device and CLI template listings
+    """
+
+    def __init__(self, ttl=PI_RESOLVER_TTL, negative_ttl=PI_RESOLVER_NEGATIVE_TTL):
+        """
+        :param ttl: id lifetime in seconds
+        :param negative_ttl: lifetime in seconds for the names not found
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        self.device_ids = {}  # device name: (PI device id or None, expiry time)
+        self.template_ids = {}  # CLI template name: (PI template id or None, expiry time)
+
+    def put(self, cache, name, entity_id):
+        """
+        :param cache: {device_ids} or {template_ids}
+        :param name: device or CLI template name
+        :param entity_id: PI id, or {None} if not found
+        :return:
+        """
+        ttl = self.ttl if entity_id is not None else self.negative_ttl
+        with self.lock:
+            cache[name] = (entity_id, time.monotonic() + ttl)
+
+    @staticmethod
+    def get(cache, name):
+        """
+        :param cache: {device_ids} or {template_ids}
+        :param name: device or CLI template name
+        :return: True and the PI id, or {None} if not found, if cached and not expired, otherwise False, {None}
+        """
+        entry = cache.get(name)
+        if entry is None or entry[1] < time.monotonic():
+            return False, None
+        return True, entry[0]
+
+    def load_device_ids(self, device_name_list):
+        """
+        This function will find the PI device ids for the devices in the {device_name_list}, with one call for each
+        {PI_FILTER_MAX_VALUES} devices, and will add them to the cache
+        Call to Prime Infrastructure - /webacs/api/v1/data/Devices, filtered using the Device Hostnames
+        :param device_name_list: list of device hostnames
+        :return: dict {device_name: PI device Id, or {None} if the device does not exist}
+        """
+        device_ids = dict.fromkeys(device_name_list)
+        header = {'content-type': 'application/json', 'accept': 'application/json'}
+        for index in range(0, len(device_name_list), PI_FILTER_MAX_VALUES):
+            names = device_name_list[index:index + PI_FILTER_MAX_VALUES]
+            url = PI_URL + '/webacs/api/v1/data/Devices?.full=true&.maxResults=' + str(PI_PAGE_SIZE)
+            url += '&deviceName=' + pi_filter_in(names)
+            response = pi_request('GET', url, headers=header, verify=False, auth=PI_AUTH)
+            for entity in response.json()['queryResponse'].get('entity', []):
+                device = pi_get_entity_dto(entity)
+                if device.get('deviceName') in device_ids:
+                    device_ids[device['deviceName']] = str(device['@id'])
+        for device_name, device_id in device_ids.items():
+            self.put(self.device_ids, device_name, device_id)
+        return device_ids
+
+    def load_template_id(self, template):
+        """
+        This function will find the PI CLI template id for the template with the name {template}, and will add it to
+        the cache
+        Call to Prime Infrastructure - /webacs/api/v1/data/CliTemplate, filtered using the template name
+        :param template: PI CLI template name
+        :return: {None} if the template does not exist, {template id} if template exists
+        """
+        url = PI_URL + '/webacs/api/v1/data/CliTemplate?name=' + template
         header = {'content-type': 'application/json', 'accept': 'application/json'}
-        session = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-        session_json = session.json()
-        utils.pprint(session_json)
+        templ = pi_request('GET', url, headers=header, verify=False, auth=PI_AUTH)
+        templ_json = templ.json()
+        templ_count = templ_json['queryResponse']['@count']
+        if templ_count == '1':  # if templ_count is "0", template does not exist
+            templ_id = templ_json['queryResponse']['entityId'][0]['$']
+        else:
+            templ_id = None
+        self.put(self.template_ids, template, templ_id)
+        return templ_id
+
+    def get_device_ids(self, device_name_list):
+        """
+        :param device_name_list: list of device hostnames
+        :return: dict {device_name: PI device Id, or {None} if the device does not exist}, only the names not
+        cached are resolved with PI calls
+        """
+        device_ids = {}
+        missing_names = []
+        for device_name in dict.fromkeys(device_name_list):
+            cached, device_id = self.get(self.device_ids, device_name)
+            device_ids[device_name] = device_id
+            if not cached:
+                missing_names.append(device_name)
+        if missing_names:
+            device_ids.update(self.load_device_ids(missing_names))
+        return device_ids
+
+    def get_template_id(self, template):
+        """
+        :param template: PI CLI template name
+        :return: {None} if the template does not exist, {template id} if template exists
+        """
+        cached, templ_id = self.get(self.template_ids, template)
+        if not cached:
+            templ_id = self.load_template_id(template)
+        return templ_id
+
+    def warm_up(self):
+        """
+        This function will load the ids for all the PI devices and CLI templates, from the paged full listings
+        :return:
+        """
+        for device in pi_iter_entities('Devices'):
+            self.put(self.device_ids, device.get('deviceName'), str(device['@id']))
+        for template in pi_iter_entities('CliTemplate'):
+            self.put(self.template_ids, template.get('name'), str(template['@id']))
+
+    def invalidate_template(self, template=None):
+        """
+        This function will remove the CLI template with the name {template} from the cache, all templates if {None}
+        :param template: PI CLI template name
+        :return:
+        """
+        with self.lock:
+            if template is None:
+                self.template_ids = {}
+            else:
+                self.template_ids.pop(template, None)
+
+    def invalidate(self):
+        """
+        This function will remove all the devices and CLI templates from the cache
+        :return:
+        """
+        with self.lock:
+            self.device_ids = {}
+            self.template_ids = {}
+
+
+PI_RESOLVER = PiResolver()
 
 
 def pi_get_device_id(device_name):
     """
-    Find out the PI device Id using the device hostname
+    Find out the PI device Id using the device hostname, from the resolver cache if available
     Call to Prime Infrastructure - /webacs/api/v1/data/Devices, filtered using the Device Hostname
     :param device_name: device hostname
-    :return: PI device Id
+    :return: PI device Id, or {None} if the device does not exist
     """
+    return PI_RESOLVER.get_device_ids([device_name])[device_name]
 
-    url = PI_URL + '/webacs/api/v1/data/Devices?deviceName=' + device_name
-    header = {'content-type': 'application/json', 'accept': 'application/json'}
-    response = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    device_id_json = response.json()
-    device_id = device_id_json['queryResponse']['entityId'][0]['$']
-    return device_id
+
+def pi_get_device_ids(device_name_list):
+    """
+    Find out the PI device Ids for all the devices in the {device_name_list}, from the resolver cache if available,
+    with one call for each {PI_FILTER_MAX_VALUES} devices not cached
+    Call to Prime Infrastructure - /webacs/api/v1/data/Devices, filtered using the Device Hostnames
+    :param device_name_list: list of device hostnames
+    :return: dict {device_name: PI device Id, or {None} if the device does not exist}
+    """
+    return PI_RESOLVER.get_device_ids(device_name_list)
 
 
 def pi_deploy_cli_template(device_id, template_name, variable_value):
@@ -129,38 +465,113 @@ def pi_deploy_cli_template(device_id, template_name, variable_value):
     }
     url = PI_URL + '/webacs/api/v1/op/cliTemplateConfiguration/deployTemplateThroughJob'
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    response = requests.put(url, data=json.dumps(param), headers=header, verify=False, auth=PI_AUTH)
+    response = pi_request('PUT', url, data=json.dumps(param), headers=header, verify=False, auth=PI_AUTH)
     job_json = response.json()
     job_name = job_json['mgmtResponse']['cliTemplateCommandJobResult']['jobName']
     return job_name
 
 
+def pi_deploy_cli_template_bulk(template_name, device_variable_values, max_targets=PI_DEPLOY_MAX_TARGETS):
+    """
+    Deploy a template to many devices, through jobs with up to {max_targets} target devices each. The device ids are
+    found with one call for each {PI_FILTER_MAX_VALUES} devices
+    Call to Prime Infrastructure - /webacs/api/v1/op/cliTemplateConfiguration/deployTemplateThroughJob
+    :param template_name: the name of the template to be deployed
+    :param device_variable_values: dict {device_name: the values of the variables for the device, or {None}}
+    :param max_targets: max number of devices in one job
+    :return: dict {device_name: PI job name}, the job name is {None} if the device does not exist
+    """
+    device_ids = pi_get_device_ids(device_variable_values)
+    device_jobs = dict.fromkeys(device_ids)
+    target_list = [(device_name, device_id) for device_name, device_id in device_ids.items() if device_id is not None]
+    url = PI_URL + '/webacs/api/v1/op/cliTemplateConfiguration/deployTemplateThroughJob'
+    header = {'content-type': 'application/json', 'accept': 'application/json'}
+    for index in range(0, len(target_list), max_targets):
+        targets = target_list[index:index + max_targets]
+        param = {
+            'cliTemplateCommand': {
+                'targetDevices': {
+                    'targetDevice': [
+                        {
+                            'targetDeviceID': str(device_id),
+                            'variableValues': {
+                                'variableValue': device_variable_values[device_name]
+                            }
+                        } for device_name, device_id in targets
+                    ]
+                },
+                'templateName': template_name
+            }
+        }
+        response = pi_request('PUT', url, data=json.dumps(param), headers=header, verify=False, auth=PI_AUTH)
+        job_json = response.json()
+        job_name = job_json['mgmtResponse']['cliTemplateCommandJobResult']['jobName']
+        for device_name, device_id in targets:
+            device_jobs[device_name] = job_name
+    return device_jobs
+
+
 def pi_get_job_status(job_name):
     """
     Get job status in PI
-    Call to Prime Infrastructure - /webacs/api/v1/data/JobSummary, filtered by the job name, will provide the job id
-    A second call to /webacs/api/v1/data/JobSummary using the job id
+    Call to Prime Infrastructure - /webacs/api/v1/data/JobSummary, filtered by the job name, full job summary
     :param job_name: Prime Infrastructure job name
     :return: PI job status
     """
+    return pi_get_job_status_bulk([job_name])[job_name]
 
-    #  find out the PI job id using the job name
 
-    url = PI_URL + '/webacs/api/v1/data/JobSummary?jobName=' + job_name
+def pi_get_job_status_bulk(job_name_list):
+    """
+    Get the status for all the jobs in the {job_name_list}, with one call for each {PI_FILTER_MAX_VALUES} jobs
+    Call to Prime Infrastructure - /webacs/api/v1/data/JobSummary, filtered by the job names, full job summaries
+    :param job_name_list: list of Prime Infrastructure job names
+    :return: dict {job_name: PI job status, or {None} if the job is not found}
+    """
+    job_names = list(dict.fromkeys(job_name_list))
+    job_status = dict.fromkeys(job_names)
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    response = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    job_id_json = response.json()
-    job_id = job_id_json['queryResponse']['entityId'][0]['$']
+    for index in range(0, len(job_names), PI_FILTER_MAX_VALUES):
+        names = job_names[index:index + PI_FILTER_MAX_VALUES]
+        url = PI_URL + '/webacs/api/v1/data/JobSummary?.full=true&.maxResults=' + str(PI_PAGE_SIZE)
+        url += '&jobName=' + pi_filter_in(names)
+        response = pi_request('GET', url, headers=header, verify=False, auth=PI_AUTH)
+        for entity in response.json()['queryResponse'].get('entity', []):
+            job_summary = pi_get_entity_dto(entity)
+            if job_summary.get('jobName') in job_status:
+                job_status[job_summary['jobName']] = job_summary.get('resultStatus')
+    return job_status
 
-    #  find out the job status using the job id
 
-    url = PI_URL + '/webacs/api/v1/data/JobSummary/' + job_id
-    header = {'content-type': 'application/json', 'accept': 'application/json'}
-    response = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    job_status_json = response.json()
-    #  print(json.dumps(job_status_json, indent=4, separators=(' , ', ' : ')))
-    job_status = job_status_json['queryResponse']['entity'][0]['jobSummaryDTO']['resultStatus']
-    return job_status
+def pi_wait_for_jobs(job_name_list, timeout=PI_JOB_TIMEOUT, first_interval=2, max_interval=15):
+    """
+    This generator will check all the jobs with the names in the {job_name_list} in one polling loop, with
+    exponential backoff, one filtered call for all the pending jobs, and will return each job result as soon as the
+    job is completed
+    :param job_name_list: list of Prime Infrastructure job names
+    :param timeout: max wait time, in seconds, for all jobs
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: (job name, status - {SUCCESS}, {PARTIAL_SUCCESS} or {FAILURE}), in the order of completion
+    :raise TimeoutError: if any of the jobs is not completed in {timeout} seconds
+    """
+    deadline = time.monotonic() + timeout
+    pending_jobs = [job_name for job_name in dict.fromkeys(job_name_list) if job_name]
+    for interval in utils.backoff_intervals(first_interval, max_interval):
+        if not pending_jobs:
+            break
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+            raise TimeoutError('PI jobs not completed in ' + str(timeout) + ' seconds: ' + ', '.join(pending_jobs))
+        time.sleep(min(interval, remaining_time))
+        job_status = pi_get_job_status_bulk(pending_jobs)
+        still_pending = []
+        for job_name in pending_jobs:
+            if job_status[job_name] in PI_JOB_DONE_STATUS:
+                yield job_name, job_status[job_name]
+            else:
+                still_pending.append(job_name)
+        pending_jobs = still_pending
 
 
 def pi_delete_cli_template(cli_template_name):
@@ -173,7 +584,8 @@ def pi_delete_cli_template(cli_template_name):
 
     url = PI_URL + '/webacs/api/v1/op/cliTemplateConfiguration/deleteTemplate?templateName='+cli_template_name
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    response = requests.delete(url, headers=header, verify=False, auth=PI_AUTH)
+    response = pi_request('DELETE', url, headers=header, verify=False, auth=PI_AUTH)
+    PI_RESOLVER.invalidate_template(cli_template_name)
     if response.status_code == 200:
         print('PI CLI Template with the name: ', cli_template_name, ' deleted')
     else:
@@ -233,7 +645,6 @@ def pi_upload_cli_template(cli_file_name, cli_template, list_variables):
     if cli_template_id is not None:
         pi_delete_cli_template(cli_template)
         print('Will upload the CLI template: ', cli_template)
-    time.sleep(2)  # required by PI pacing
     cli_file = open(cli_file_name, 'r')
     cli_config = cli_file.read()
     param = {
@@ -250,7 +661,8 @@ def pi_upload_cli_template(cli_file_name, cli_template, list_variables):
     }
     url = PI_URL + '/webacs/api/v1/op/cliTemplateConfiguration/upload'
     header = {'content-type': 'application/json', 'accept': 'application/json'}
-    requests.post(url, json.dumps(param), headers=header, verify=False, auth=PI_AUTH)
+    pi_request('POST', url, data=json.dumps(param), headers=header, verify=False, auth=PI_AUTH)
+    PI_RESOLVER.invalidate_template(cli_template)
     cli_file.close()
     cli_template_id = pi_get_cli_template(cli_template)
     return cli_template_id
@@ -258,20 +670,9 @@ def pi_upload_cli_template(cli_file_name, cli_template, list_variables):
 
 def pi_get_cli_template(template):
     """
-    This function will check if PI has already a CLI template with the name {template}
+    This function will check if PI has already a CLI template with the name {template}, from the resolver cache if
+    available
     :param template: PI CLI template name
     :return: {None} if the template does not exist, {template id} if template exists
     """
-    url = PI_URL + '/webacs/api/v1/data/CliTemplate?name='+template
-    header = {'content-type': 'application/json', 'accept': 'application/json'}
-    templ = requests.get(url, headers=header, verify=False, auth=PI_AUTH)
-    templ_json = templ.json()
-    templ_count = templ_json['queryResponse']['@count']
-    if templ_count == '1':  # if templ_count is "0", template does not exist
-        templ_id = templ_json['queryResponse']['entityId'][0]['$']
-    else:
-        templ_id = None
-    return templ_id
-
-
-
+    return PI_RESOLVER.get_template_id(template)
@@ -0,0 +1,137 @@
+
+# developed by Gabi Zapodeanu, TSA, GPO, Cisco Systems
+
+
+# !/usr/bin/env python3
+
+
+# this module includes compact records for the DNA C and APIC-EM inventory, host, interface and PnP JSON objects.
+# Each record keeps only the most used keys, in __slots__ attributes, with the repeated values interned.
+# Example, all the devices, one inventory page in memory at the time:
+#   device_list = list(records.iter_records(records.DeviceRecord, dnac_apis.iter_devices(dnac_token)))
+
+
+import sys
+
+
+class Record:
+    """
+    Base class for the compact records. The subclasses define the {__slots__} attributes, the JSON key for each
+    attribute in {json_keys}, and the attributes with a small set of values, like the device family or the host
+    type, in {interned}. These attribute values are shared by all the records
+    """
+    __slots__ = ()
+    json_keys = ()
+    interned = frozenset()
+
+    def __init__(self, *args, **kwargs):
+        """
+        :param args: the attribute values, in the {__slots__} order
+        :param kwargs: the attribute values, by name, the missing attributes are {None}
+        """
+        for attribute, value in zip(self.__slots__, args):
+            setattr(self, attribute, value)
+        for attribute in self.__slots__[len(args):]:
+            setattr(self, attribute, kwargs.pop(attribute, None))
+        if kwargs:
+            raise TypeError('Unknown attributes: ' + ', '.join(kwargs))
+
+    @classmethod
+    def from_json(cls, record_json):
+        """
+        This function will create the record from the JSON object, all the other keys are ignored
+        :param record_json: JSON object, dict
+        :return: the record
+        """
+        record = cls.__new__(cls)
+        for attribute, key in zip(cls.__slots__, cls.json_keys):
+            value = record_json.get(key)
+            if attribute in cls.interned and type(value) is str:
+                value = sys.intern(value)
+            setattr(record, attribute, value)
+        return record
+
+    def to_json(self):
+        """
+        :return: the record as a JSON object, dict, with the original keys
+        """
+        return {key: getattr(self, attribute) for attribute, key in zip(self.__slots__, self.json_keys)}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, attribute) == getattr(other, attribute) for attribute in self.__slots__)
+
+    def __hash__(self):
+        return hash((type(self), getattr(self, self.__slots__[0])))  # the first attribute is the id, always hashable
+
+    def __repr__(self):
+        return type(self).__name__ + '(' + ', '.join(
+            attribute + '=' + repr(getattr(self, attribute)) for attribute in self.__slots__) + ')'
+
+
+class DeviceRecord(Record):
+    """
+    Network device, /network-device
+    """
+    __slots__ = ('id', 'hostname', 'management_ip', 'serial_number', 'platform_id', 'software_version', 'family',
+                 'role', 'device_type', 'reachability', 'up_time', 'location')
+    json_keys = ('id', 'hostname', 'managementIpAddress', 'serialNumber', 'platformId', 'softwareVersion', 'family',
+                 'role', 'type', 'reachabilityStatus', 'upTime', 'location')
+    interned = frozenset(('platform_id', 'software_version', 'family', 'role', 'device_type', 'reachability',
+                          'location'))
+
+
+class HostRecord(Record):
+    """
+    Client, /host
+    """
+    __slots__ = ('id', 'host_ip', 'host_mac', 'host_type', 'vlan_id', 'connected_device_id',
+                 'connected_device_name', 'connected_interface_name')
+    json_keys = ('id', 'hostIp', 'hostMac', 'hostType', 'vlanId', 'connectedNetworkDeviceId',
+                 'connectedNetworkDeviceName', 'connectedInterfaceName')
+    interned = frozenset(('host_type', 'vlan_id', 'connected_device_id', 'connected_device_name',
+                          'connected_interface_name'))
+
+
+class InterfaceRecord(Record):
+    """
+    Network device interface, /interface
+    """
+    __slots__ = ('id', 'device_id', 'port_name', 'ipv4_address', 'ipv4_mask', 'mac_address', 'status',
+                 'admin_status', 'vlan_id', 'speed')
+    json_keys = ('id', 'deviceId', 'portName', 'ipv4Address', 'ipv4Mask', 'macAddress', 'status', 'adminStatus',
+                 'vlanId', 'speed')
+    interned = frozenset(('device_id', 'port_name', 'ipv4_mask', 'status', 'admin_status', 'vlan_id', 'speed'))
+
+
+class PnpDeviceRecord(Record):
+    """
+    PnP device, /onboarding/pnp-device, the device details are in the {deviceInfo} object
+    """
+    __slots__ = ('id', 'serial_number', 'pid', 'hostname', 'state', 'onb_state', 'last_contact')
+    json_keys = ('id', 'serialNumber', 'pid', 'hostname', 'state', 'onbState', 'lastContact')
+    interned = frozenset(('pid', 'state', 'onb_state'))
+
+    @classmethod
+    def from_json(cls, record_json):
+        """
+        This function will create the record from the PnP device JSON object
+        :param record_json: JSON object, dict, with the {deviceInfo} object
+        :return: the record
+        """
+        record = super().from_json(record_json.get('deviceInfo', {}))
+        record.id = record_json.get('id')
+        return record
+
+
+def iter_records(record_class, json_iterable):
+    """
+    This generator will create the records from the JSON objects, one at the time, the JSON objects are not
+    referenced after the record is created
+    :param record_class: record class, example DeviceRecord
+    :param json_iterable: iterable with the JSON objects, example dnac_apis.iter_devices(dnac_token)
+    :return: the records, one at the time
+    """
+    for record_json in json_iterable:
+        yield record_class.from_json(record_json)
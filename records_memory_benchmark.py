@@ -0,0 +1,109 @@
+# developed by Gabi Zapodeanu, TME, Enterprise Networks, Cisco Systems
+
+
+# !/usr/bin/env python3
+
+
+import gc
+import json
+import random
+import tracemalloc
+
+import records  # import the records module
+import utils  # import the utils module
+
+
+DEVICE_COUNT = 20000
+HOST_COUNT = 200000
+
+
+def create_device_json(index):
+    """
+    This function will create a synthetic /network-device JSON object, with all the keys returned by DNA C
+    :param index: device index, used for hostname, addresses and ids
+    :return: device JSON object
+    """
+    return {
+        'id': '%08x-0000-4000-8000-%012x' % (index, index), 'hostname': 'SW' + str(index) + '.abc.inc',
+        'managementIpAddress': '10.%d.%d.1' % (index // 250 % 250, index % 250),
+        'serialNumber': 'FOC%08d' % index, 'platformId': random.choice(['C9300-48U', 'C9300-24P', 'ISR4451-X/K9']),
+        'softwareVersion': random.choice(['16.9.3', '16.12.4', '17.3.1']), 'family': 'Switches and Hubs',
+        'role': random.choice(['ACCESS', 'DISTRIBUTION', 'CORE']), 'type': 'Cisco Catalyst 9300 Switch',
+        'reachabilityStatus': 'Reachable', 'upTime': '%d days, 2:10:33.12' % (index % 400),
+        'location': None, 'macAddress': 'f8:7b:20:%02x:%02x:%02x' % (index % 256, index // 256 % 256, 1),
+        'collectionStatus': 'Managed', 'collectionInterval': 'Global Default', 'errorCode': None,
+        'errorDescription': None, 'interfaceCount': '52', 'lastUpdateTime': 1559585930912,
+        'lastUpdated': '2019-06-03 18:18:50', 'lineCardCount': '2', 'lineCardId': 'a1b2, c3d4',
+        'locationName': None, 'memorySize': 'NA', 'series': 'Cisco Catalyst 9300 Series Switches',
+        'snmpContact': '', 'snmpLocation': '', 'tagCount': '0', 'tunnelUdpPort': None, 'waasDeviceMode': None,
+        'bootDateTime': '2019-01-01 12:00:00', 'apManagerInterfaceIp': '', 'associatedWlcIp': '',
+        'instanceTenantId': '5c3f2d3e5b4a2b008c1d2e3f', 'instanceUuid': '%08x-0000-4000-8000-%012x' % (index, index),
+        'inventoryStatusDetail': '<status><general code="SUCCESS"/></status>', 'roleSource': 'AUTO',
+        'softwareType': 'IOS-XE', 'platform': 'C9300'}
+
+
+def create_host_json(index):
+    """
+    This function will create a synthetic /host JSON object, with all the keys returned by DNA C
+    :param index: host index, used for addresses and ids
+    :return: host JSON object
+    """
+    device_index = index % DEVICE_COUNT
+    return {
+        'id': '%08x-1111-4000-8000-%012x' % (index, index), 'hostIp': '10.%d.%d.%d' % (
+            index // 62500 % 250, index // 250 % 250, index % 250 + 2),
+        'hostMac': '00:50:56:%02x:%02x:%02x' % (index % 256, index // 256 % 256, index // 65536 % 256),
+        'hostType': random.choice(['wired', 'wireless']), 'vlanId': str(100 + index % 8),
+        'connectedNetworkDeviceId': '%08x-0000-4000-8000-%012x' % (device_index, device_index),
+        'connectedNetworkDeviceIpAddress': '10.%d.%d.1' % (device_index // 250 % 250, device_index % 250),
+        'connectedNetworkDeviceName': 'SW' + str(device_index) + '.abc.inc',
+        'connectedInterfaceId': '%08x-2222-4000-8000-%012x' % (index % 48, device_index),
+        'connectedInterfaceName': 'GigabitEthernet1/0/' + str(index % 48 + 1), 'lastUpdated': '1559585930912',
+        'source': '200', 'pointOfAttachment': None, 'pointOfPresence': None, 'subType': 'UNKNOWN'}
+
+
+def measure(build_function):
+    """
+    This function will measure the memory retained by the object returned by the {build_function}
+    :param build_function: function with no parameters
+    :return: the object, and the retained memory in bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build_function()
+    gc.collect()
+    retained_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, retained_size
+
+
+def main():
+    """
+    The script will create the synthetic JSON text for {DEVICE_COUNT} devices and {HOST_COUNT} clients, and will
+    compare the memory retained by the JSON objects, dicts, with the memory retained by the compact records
+    created from the same JSON text, one JSON object decoded at the time
+    """
+
+    random.seed(0)
+    device_text = json.dumps([create_device_json(index) for index in range(DEVICE_COUNT)])
+    host_text = json.dumps([create_host_json(index) for index in range(HOST_COUNT)])
+
+    for name, record_class, text in (('Devices', records.DeviceRecord, device_text),
+                                     ('Hosts', records.HostRecord, host_text)):
+        dict_list, dict_size = measure(lambda: json.loads(text))
+        del dict_list
+        record_list, record_size = measure(
+            lambda: list(records.iter_records(record_class, utils.iter_json_array([text]))))
+        print('\n' + name + ': ', len(record_list), ' objects')
+        print('JSON dicts:      ', round(dict_size / 1e6, 1), ' MB, ', round(dict_size / len(record_list)),
+              ' bytes/object')
+        print('Compact records: ', round(record_size / 1e6, 1), ' MB, ', round(record_size / len(record_list)),
+              ' bytes/object')
+        print('Reduction: ', round(dict_size / record_size, 1), 'x')
+        del record_list
+
+    print('\n\nEnd of Application Run\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+
+# developed by Gabi Zapodeanu, TSA, GPO, Cisco Systems
+
+# !/usr/bin/env python3
+
+# this module includes the tests for the utils module, run with: python -m unittest test_utils
+
+import json
+import unittest
+
+import utils  # import the utils module
+
+
+class IterJsonArrayTest(unittest.TestCase):
+
+    def test_chunk_boundary_in_number(self):
+        """
+        The numbers split between two chunks, after the '.', the 'e', or the sign, are decoded as one number
+        """
+        for chunks, elements in (([b'[23', b'.', b'5]'], [23.5]),
+                                 ([b'[1', b'e', b'5]'], [1e5]),
+                                 ([b'[{"a":1},23.', b'5]'], [{'a': 1}, 23.5]),
+                                 ([b'[-', b'1.5E', b'+2, 7', b']'], [-150.0, 7]),
+                                 ([b'[1', b'2', b'3', b']'], [123])):
+            with self.subTest(chunks=chunks):
+                self.assertEqual(list(utils.iter_json_array(chunks)), elements)
+
+    def test_every_chunk_boundary(self):
+        """
+        The array is decoded the same for each split position, one byte chunks included
+        """
+        elements = [{'id': 'a1', 'hostIp': '10.1.1.2'}, 23.5, -1e-3, 'text, with ] and "', True, None, [1, 2], 0]
+        text = json.dumps(elements).encode()
+        for split in range(1, len(text)):
+            with self.subTest(split=split):
+                self.assertEqual(list(utils.iter_json_array([text[:split], text[split:]])), elements)
+        self.assertEqual(list(utils.iter_json_array([text[i:i + 1] for i in range(len(text))])), elements)
+
+    def test_not_complete(self):
+        with self.assertRaises(ValueError):
+            list(utils.iter_json_array([b'[1, 2', b'.']))
+
+
+if __name__ == '__main__':
+    unittest.main()
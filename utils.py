@@ -6,6 +6,7 @@
 # this module includes common utilized utility functions
 
 import json
+import codecs  # needed for the incremental utf-8 decoding
 import sys
 import select
 import requests
@@ -15,14 +16,37 @@ import os
 import os.path
 import socket  # needed for IPv4 validation
 import re  # needed for regular expressions matching
+import collections  # needed for the configuration records
+import bisect  # needed for the sorted prefix index
+import ipaddress  # needed for the prefix calculations
 import subprocess  # needed for ping tool
 
+from concurrent.futures import ProcessPoolExecutor  # needed for the parallel configuration analysis
+from concurrent.futures import ThreadPoolExecutor, as_completed  # needed for the batch path traces
 from PIL import Image, ImageDraw, ImageFont  # needed for the image processing
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 from requests.auth import HTTPBasicAuth  # for Basic Auth
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)  # Disable insecure https warnings
 
+JSON_SEPARATORS = re.compile(r'[\s,]*')  # whitespace and separators between the JSON array elements
+JSON_NUMBER_END = frozenset(' \t\n\r,]')  # the characters that end a JSON number
+
+IPV4_OCTET = r'(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+IPV4_ADDRESS = IPV4_OCTET + r'(?:\.' + IPV4_OCTET + r'){3}'
+IPV4_ADDRESS_PATTERN = re.compile(r'(?<![\d.])' + IPV4_ADDRESS + r'(?!\.?\d)')  # any IPv4 address in a text line
+
+# configuration lines used to find the interface addresses, the groups are:
+# 1 - interface name, 2 - VRF name, 3, 4, 5 - ip address, mask and secondary, no group - any other configuration
+# section start, that ends the interface section
+CONFIG_LINE_PATTERN = re.compile(
+    r'\n(?:interface[ \t]+(\S+)'
+    r'|[ \t]+(?:ip )?vrf forwarding[ \t]+(\S+)'
+    r'|[ \t]*ip address[ \t]+(' + IPV4_ADDRESS + r')[ \t]+(' + IPV4_ADDRESS + r')(?![\d.])([ \t]+secondary)?'
+    r'|[^\s!])')
+
+IPv4ConfigAddress = collections.namedtuple('IPv4ConfigAddress', ['interface', 'vrf', 'address', 'mask', 'secondary'])
+
 
 def pprint(json_data):
     """
@@ -122,26 +146,209 @@ def identify_ipv4_address(configuration):
     :param configuration: string with the configuration
     :return: list of IPv4 addresses
     """
-    ipv4_list =[]
-    pattern = re.compile('^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')
-    split_lines = configuration.split('\n')  # split configuration file in individual commands'
-    for line in split_lines:
-        print(line)
-        if 'ip address' in line:  # check if command includes the string 'ip address'
-            split_config = line.split(' ')  # split the command in words
-            try:
-                split_config.remove('')  # remove the first ' ' if existing in the command
-            except:
-                pass
-            line_begins = split_config[0:3]  # select the three items in the list
-            for word in line_begins:
-                check_ip = pattern.match(word)  # match each word with the patern from regex
-                if check_ip:
-                    if validate_ipv4_address(word):  # validate if the octets are valid IP addresses
-                        ipv4_list.append(word)
+    ipv4_list = [record.address for record in parse_ipv4_config(configuration)]
     return ipv4_list
 
 
+def parse_ipv4_config(configuration):
+    """
+    This function will parse the configuration in one pass, and will return a record for each primary or secondary
+    IPv4 address configured with the {ip address a.b.c.d m.m.m.m [secondary]} command
+    :param configuration: string with the configuration
+    :return: list of IPv4ConfigAddress(interface, vrf, address, mask, secondary), {interface} and {vrf} are {None} if
+             the address is not configured under an interface, or not part of a VRF
+    """
+    ipv4_records = []
+    interface_name = None
+    vrf_name = None
+    for match in CONFIG_LINE_PATTERN.finditer('\n' + configuration):
+        group_index = match.lastindex
+        if group_index is None:  # a new configuration section
+            interface_name = None
+            vrf_name = None
+        elif group_index >= 4:
+            ipv4_records.append(IPv4ConfigAddress(interface_name, vrf_name, match.group(3), match.group(4),
+                                                  group_index == 5))
+        elif group_index == 1:
+            interface_name = match.group(1)
+            vrf_name = None
+        elif interface_name is not None:
+            vrf_name = match.group(2)
+    return ipv4_records
+
+
+def parse_config_shard(config_shard):
+    """
+    This function will parse all the configurations in the {config_shard}, used by the {analyze_configs} workers.
+    The records are returned as plain tuples, faster to pickle than the named tuples
+    :param config_shard: list of (device, configuration)
+    :return: list of (device, list of (interface, vrf, address, mask, secondary))
+    """
+    return [(device, [tuple(record) for record in parse_ipv4_config(configuration)])
+            for device, configuration in config_shard]
+
+
+def analyze_configs(config_list, workers=None, shards_per_worker=4):
+    """
+    This function will parse all the configurations in the {config_list} using a pool of worker processes, and will
+    merge the results in one report. The configurations are sent to the workers in a few large shards, and the
+    workers return only the compact address records, to keep the pickling overhead low
+    :param config_list: list of (device, configuration)
+    :param workers: number of worker processes, default is the number of CPUs
+    :param shards_per_worker: number of shards for each worker, for load balancing
+    :return: report dict:
+             devices - {device: list of IPv4ConfigAddress}
+             addresses - {address: list of (device, interface, vrf)}
+             duplicates - {(vrf, address): list of (device, interface)}, addresses configured more than once in
+                          the same VRF
+    """
+    config_list = list(config_list)
+    workers = workers or os.cpu_count() or 1
+    shard_size = max(1, -(-len(config_list) // (workers * shards_per_worker)))
+    config_shards = [config_list[index:index + shard_size] for index in range(0, len(config_list), shard_size)]
+    if workers == 1 or len(config_shards) <= 1:
+        shard_results = map(parse_config_shard, config_shards)
+        return merge_config_reports(shard_results)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        shard_results = executor.map(parse_config_shard, config_shards)
+        return merge_config_reports(shard_results)
+
+
+def merge_config_reports(shard_results):
+    """
+    This function will merge the results from the {analyze_configs} shards in one report
+    :param shard_results: iterable with the shard results, see {parse_config_shard}
+    :return: report dict, see {analyze_configs}
+    """
+    devices = {}
+    addresses = {}
+    vrf_addresses = {}
+    for shard_result in shard_results:
+        for device, ipv4_records in shard_result:
+            devices[device] = [IPv4ConfigAddress._make(record) for record in ipv4_records]
+            for interface, vrf, address, mask, secondary in ipv4_records:
+                addresses.setdefault(address, []).append((device, interface, vrf))
+                vrf_addresses.setdefault((vrf, address), []).append((device, interface))
+    duplicates = {key: entries for key, entries in vrf_addresses.items() if len(entries) > 1}
+    return {'devices': devices, 'addresses': addresses, 'duplicates': duplicates}
+
+
+class SubnetIndex:
+    """
+    Index of the IPv4 prefixes configured on the network devices interfaces, for each VRF.
+    The prefixes are kept in a hash table and in a sorted list for each VRF. A candidate prefix overlaps an existing
+    prefix only if one of them includes the other: the including prefixes are found with at most 33 hash lookups,
+    the included prefixes with a binary search, O(log n) for each candidate prefix
+    """
+
+    def __init__(self):
+        self.prefixes = {}  # (vrf, network address, prefix length): list of (device, interface)
+        self.vrf_keys = {}  # vrf: sorted list of (network address, prefix length)
+        self.sorted_vrfs = set()
+
+    def add(self, device, interface, vrf, address, mask):
+        """
+        This function will add the prefix for the interface address {address} {mask} to the index
+        :param device: device name
+        :param interface: interface name
+        :param vrf: VRF name, or {None} for the global routing table
+        :param address: IPv4 address
+        :param mask: IPv4 mask
+        :return:
+        """
+        network = ipaddress.IPv4Network((address, mask), strict=False)
+        key = (int(network.network_address), network.prefixlen)
+        if (vrf,) + key not in self.prefixes:
+            self.prefixes[(vrf,) + key] = []
+            self.vrf_keys.setdefault(vrf, []).append(key)
+            self.sorted_vrfs.discard(vrf)
+        self.prefixes[(vrf,) + key].append((device, interface))
+
+    def add_config(self, device, configuration):
+        """
+        This function will add to the index all the interface prefixes from the {configuration}
+        :param device: device name
+        :param configuration: device configuration
+        :return:
+        """
+        for record in parse_ipv4_config(configuration):
+            self.add(device, record.interface, record.vrf, record.address, record.mask)
+
+    def add_report(self, report):
+        """
+        This function will add to the index all the interface prefixes from the {analyze_configs} report
+        :param report: {analyze_configs} report
+        :return:
+        """
+        for device, ipv4_records in report['devices'].items():
+            for record in ipv4_records:
+                self.add(device, record.interface, record.vrf, record.address, record.mask)
+
+    def get_vrf_keys(self, vrf):
+        """
+        This function will return the sorted prefixes list for the {vrf}
+        :param vrf: VRF name
+        :return: sorted list of (network address, prefix length)
+        """
+        vrf_keys = self.vrf_keys.get(vrf, [])
+        if vrf not in self.sorted_vrfs:
+            vrf_keys.sort()
+            self.sorted_vrfs.add(vrf)
+        return vrf_keys
+
+    def overlaps(self, vrf, address, mask, across_vrfs=False):
+        """
+        This function will find all the indexed prefixes that overlap the prefix for {address} {mask}
+        :param vrf: VRF name, or {None} for the global routing table
+        :param address: IPv4 address
+        :param mask: IPv4 mask
+        :param across_vrfs: if True, search the prefixes from all the VRFs
+        :return: list of (vrf, prefix, device, interface)
+        """
+        network = ipaddress.IPv4Network((address, mask), strict=False)
+        start = int(network.network_address)
+        end = int(network.broadcast_address)
+        overlap_list = []
+        for search_vrf in (list(self.vrf_keys) if across_vrfs else [vrf]):
+            found_keys = []
+
+            # including prefixes, same or shorter prefix length
+            for prefix_length in range(network.prefixlen + 1):
+                key = (start & ((0xFFFFFFFF << (32 - prefix_length)) & 0xFFFFFFFF), prefix_length)
+                if (search_vrf,) + key in self.prefixes:
+                    found_keys.append(key)
+
+            # included prefixes, longer prefix length, network address in the candidate range
+            vrf_keys = self.get_vrf_keys(search_vrf)
+            first_index = bisect.bisect_left(vrf_keys, (start, 0))
+            last_index = bisect.bisect_right(vrf_keys, (end, 32))
+            for key in vrf_keys[first_index:last_index]:
+                if key[1] > network.prefixlen:
+                    found_keys.append(key)
+
+            for key in found_keys:
+                prefix = str(ipaddress.IPv4Address(key[0])) + '/' + str(key[1])
+                for device, interface in self.prefixes[(search_vrf,) + key]:
+                    overlap_list.append((search_vrf, prefix, device, interface))
+        return overlap_list
+
+    def check_config(self, configuration, across_vrfs=False, exclude_device=None):
+        """
+        This function will check all the interface prefixes from the candidate {configuration} against the index
+        :param configuration: candidate configuration, example the content of GRE_DC_Config.txt
+        :param across_vrfs: if True, check each prefix against the prefixes from all the VRFs
+        :param exclude_device: device name to ignore, example the device that will receive the configuration
+        :return: list of (IPv4ConfigAddress, list of (vrf, prefix, device, interface)), only the overlapping addresses
+        """
+        config_overlaps = []
+        for record in parse_ipv4_config(configuration):
+            overlap_list = [overlap for overlap in self.overlaps(record.vrf, record.address, record.mask, across_vrfs)
+                            if overlap[2] != exclude_device]
+            if overlap_list:
+                config_overlaps.append((record, overlap_list))
+        return config_overlaps
+
+
 def ping_return_code(hostname):
     """
     Use the ping utility to attempt to reach the host. We send 5 packets
@@ -168,3 +375,222 @@ def get_epoch_current_time():
     """
     epoch = time.time()*1000
     return int(epoch)
+
+
+UPTIME_PATTERN = re.compile(r'(?:(\d+)\s+days?,?\s*)?(\d+):(\d+):(\d+(?:\.\d+)?)')
+
+
+def uptime_to_seconds(up_time):
+    """
+    This function will convert the device up time to seconds
+    :param up_time: up time, example '118 days, 4:35:08.00', or number of seconds
+    :return: seconds, float, or NaN if the up time is missing or in an unknown format
+    """
+    if isinstance(up_time, (int, float)):
+        return float(up_time)
+    match = UPTIME_PATTERN.search(up_time or '')
+    if match is None:
+        return float('nan')
+    days, hours, minutes, seconds = match.groups()
+    return int(days or 0) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def to_float(value):
+    """
+    This function will convert the JSON value to a float
+    :param value: number, or string with a number, example 12, '3.5', '42%'
+    :return: float, or NaN if the value is missing or not a number
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    try:
+        return float(str(value).strip().rstrip('%'))
+    except ValueError:
+        return float('nan')
+
+
+def backoff_intervals(first_interval, max_interval, factor=2):
+    """
+    This generator will return the wait intervals for polling with exponential backoff:
+    {first_interval}, {first_interval} * {factor}, ..., capped at {max_interval}
+    :param first_interval: first wait interval, seconds
+    :param max_interval: max wait interval, seconds
+    :param factor: multiplier for the next interval
+    :return: wait interval in seconds, no end
+    """
+    interval = first_interval
+    while True:
+        yield interval
+        interval = min(interval * factor, max_interval)
+
+
+PATH_TRACE_DONE = ('COMPLETED', 'FAILED')  # path trace final status
+
+
+def wait_for_path_trace(path_id, info_function, ticket, timeout=120, first_interval=0.5, max_interval=10):
+    """
+    This function will poll the path trace {path_id} until the status is {COMPLETED} or {FAILED}.
+    The first check is after {first_interval} seconds, the interval between checks doubles up to {max_interval}
+    :param path_id: path trace id
+    :param info_function: function returning the path trace status and details, example
+    dnac_apis.get_path_trace_info or apic_em_apis.get_path_trace_info
+    :param ticket: DNA C token or APIC-EM ticket
+    :param timeout: max wait time, in seconds
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: path trace status and details, the status is not final if the path trace is not done in {timeout}
+    """
+    deadline = time.monotonic() + timeout
+    path_status, path_list = None, []
+    for interval in backoff_intervals(first_interval, max_interval):
+        remaining_time = deadline - time.monotonic()
+        if remaining_time <= 0:
+            break
+        time.sleep(min(interval, remaining_time))
+        path_status, path_list = info_function(path_id, ticket)
+        if path_status in PATH_TRACE_DONE:
+            break
+    return path_status, path_list
+
+
+def delete_path_traces(path_id_list, delete_function, ticket, max_workers=10):
+    """
+    This function will delete all the path traces with the ids in the {path_id_list}, {max_workers} at the time
+    :param path_id_list: list of path trace ids
+    :param delete_function: function deleting one path trace, example apic_em_apis.delete_path_trace
+    :param ticket: DNA C token or APIC-EM ticket
+    :param max_workers: max number of concurrent deletes
+    :return: dict {path_id: delete function return value, or {None} if failed}
+    """
+
+    def delete_path_trace(path_id):
+        try:
+            return delete_function(path_id, ticket)
+        except Exception:
+            return None
+
+    path_id_list = list(dict.fromkeys(path_id_list))
+    if not path_id_list:
+        return {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return dict(zip(path_id_list, executor.map(delete_path_trace, path_id_list)))
+
+
+def run_path_traces(flow_list, create_function, info_function, ticket, delete_function=None, max_active=10,
+                    timeout=120, first_interval=0.5, max_interval=10):
+    """
+    This generator will run a path trace for each flow in the {flow_list}, at most {max_active} path traces in
+    progress at the time, each polled with backoff until done, see {wait_for_path_trace}.
+    The results are returned as soon as each path trace is done, not in the {flow_list} order.
+    If {delete_function} is provided, all the created path traces are deleted at the end, in bulk
+    :param flow_list: list of (source IP address, destination IP address)
+    :param create_function: function creating one path trace, example dnac_apis.create_path_trace
+    :param info_function: function returning the path trace status and details, example
+    dnac_apis.get_path_trace_info
+    :param ticket: DNA C token or APIC-EM ticket
+    :param delete_function: function deleting one path trace, example dnac_apis.delete_path_trace, or {None}
+    :param max_active: max number of path traces in progress
+    :param timeout: max wait time, in seconds, for each path trace
+    :param first_interval: wait time before the first check, in seconds
+    :param max_interval: max wait time between checks, in seconds
+    :return: (src_ip, dest_ip, path_id, path_status, path_list), path_id and path_status are {None} if the path
+    trace create or check failed
+    """
+    created_path_ids = []
+
+    def run_path_trace(src_ip, dest_ip):
+        path_id = None
+        try:
+            path_id = create_function(src_ip, dest_ip, ticket)
+            created_path_ids.append(path_id)
+            path_status, path_list = wait_for_path_trace(path_id, info_function, ticket, timeout, first_interval,
+                                                         max_interval)
+        except Exception:
+            path_status, path_list = None, []
+        return src_ip, dest_ip, path_id, path_status, path_list
+
+    executor = ThreadPoolExecutor(max_workers=max_active)
+    try:
+        futures = [executor.submit(run_path_trace, src_ip, dest_ip) for src_ip, dest_ip in flow_list]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if delete_function is not None:
+            delete_path_traces(created_path_ids, delete_function, ticket, max_active)
+
+
+def iter_json_array(chunks):
+    """
+    This generator will decode the JSON array received in {chunks}, and will return each array element as soon as
+    it is decoded. Only the current element is held in memory, not the entire JSON document
+    :param chunks: iterable with the JSON text, bytes or string chunks, example response.iter_content(65536)
+    :return: the array elements, one at the time
+    :raise ValueError: if the JSON document is not an array, or it is not complete
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pending_chunks = []
+    pending_size = 0
+    retry_size = 0  # decode a large element again only after the buffer doubles
+    array_started = False
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = text_decoder.decode(chunk)
+        pending_chunks.append(chunk)
+        pending_size += len(chunk)
+        if len(buffer) + pending_size < retry_size:
+            continue
+        buffer += ''.join(pending_chunks)
+        pending_chunks = []
+        pending_size = 0
+        if not array_started:
+            buffer = buffer.lstrip()
+            if not buffer:
+                continue
+            if buffer[0] != '[':
+                raise ValueError('The JSON document is not an array')
+            buffer = buffer[1:]
+            array_started = True
+        buffer, retry_size, array_end = yield from _decode_json_array_buffer(decoder, buffer, False)
+        if array_end:
+            return
+    buffer += ''.join(pending_chunks) + text_decoder.decode(b'', final=True)
+    if not array_started:
+        buffer = buffer.lstrip()
+        if not buffer.startswith('['):
+            raise ValueError('The JSON document is not an array')
+        buffer = buffer[1:]
+    buffer, retry_size, array_end = yield from _decode_json_array_buffer(decoder, buffer, True)
+    if not array_end:
+        raise ValueError('The JSON array is not complete')
+
+
+def _decode_json_array_buffer(decoder, buffer, final):
+    """
+    This generator will return all the complete JSON array elements from the {buffer}
+    :param decoder: JSON decoder
+    :param buffer: JSON text, after the array start
+    :param final: True if there is no more JSON text to be received
+    :return: the array elements, and at the end the tuple (text not decoded, retry size, array end found)
+    """
+    position = 0
+    buffer_size = len(buffer)
+    while True:
+        position = JSON_SEPARATORS.match(buffer, position).end()
+        if position == buffer_size:
+            return '', 0, False
+        if buffer[position] == ']':
+            return '', 0, True
+        try:
+            element, end_position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return buffer[position:], 2 * (buffer_size - position), False
+        if not final and not isinstance(element, (dict, list, str)) and (
+                end_position == buffer_size or buffer[end_position] not in JSON_NUMBER_END):
+            return buffer[position:], 0, False  # a number may continue in the next chunk, example '23.' and '5'
+        position = end_position
+        yield element